@@ -0,0 +1,99 @@
+import argparse
+import logging
+import os
+
+from app.instance.config import ConfigSettings
+
+
+APP_PATH = 'app.main:app'
+
+
+def post_fork(server, worker):
+    from app.services.database import async_engine, engine, replica_set
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    for replica in replica_set.replicas:
+        replica.engine.dispose(close=False)
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'preload_app': args.preload,
+        'timeout': ConfigSettings.SERVER_TIMEOUT,
+        'post_fork': post_fork,
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Server().run()
+
+
+def run_uvicorn(args):
+    import uvicorn
+
+    uvicorn.run(APP_PATH, host=args.host, port=args.port, loop='uvloop', http='httptools')
+
+
+def serve(args):
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s:     %(name)s %(message)s')
+    # Pool limits and the shared cache counters are sized from WEB_CONCURRENCY when app.main is imported,
+    # which has to happen after this.
+    os.environ['WEB_CONCURRENCY'] = str(args.workers)
+    ConfigSettings.WEB_CONCURRENCY = args.workers
+    if args.workers > 1 or args.preload:
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+
+def migrate(args):
+    from app.migrations import load_migrations, migrate as apply_migrations, pending_migrations
+    from app.services.database import engine
+
+    if args.status:
+        pending = {migration.version for migration in pending_migrations(engine)}
+        for migration in load_migrations():
+            print(f"{migration.version:04d} {migration.name} {'pending' if migration.version in pending else 'applied'}")
+        return
+
+    for migration in apply_migrations(engine):
+        print(f'applied {migration.version:04d} {migration.name}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Run the API with uvloop and httptools.')
+    serve_parser.add_argument('--host', default=ConfigSettings.SERVER_HOST)
+    serve_parser.add_argument('--port', type=int, default=ConfigSettings.SERVER_PORT)
+    serve_parser.add_argument('--workers', type=int, default=ConfigSettings.WEB_CONCURRENCY)
+    serve_parser.add_argument(
+        '--preload', action=argparse.BooleanOptionalAction, default=ConfigSettings.SERVER_PRELOAD
+    )
+    serve_parser.set_defaults(handler=serve)
+
+    migrate_parser = commands.add_parser('migrate', help='Apply pending schema migrations.')
+    migrate_parser.add_argument('--status', action='store_true', help='List migrations without applying them.')
+    migrate_parser.set_defaults(handler=migrate)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
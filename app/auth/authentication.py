@@ -2,15 +2,17 @@ import os
 from datetime import timedelta, datetime
 from fastapi import Depends
 from pydantic import BaseModel
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.exceptions import *
 
+from app.auth.cache import token_cache
+from app.auth.hashing import hashing_pool
 from app.auth.oauth2 import oauth2_scheme
 from app.models import User
 from app.schemas.schemas import UserInDB, UserRead
-from app.services.database import get_db
+from app.services.database import get_async_db
+from app.services.profiling import span
 
 
 SECRET_KEY = os.environ.get('SECRET_KEY', 'my_secret_key_123')
@@ -27,19 +29,9 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-
-def get_user(db, username: str):
-    db_user = db.query(User).filter(User.email == username).first()
+async def get_user(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.email == username))
+    db_user = result.scalars().first()
     if db_user:
         return UserInDB(
             id=db_user.id,
@@ -49,12 +41,19 @@ def get_user(db, username: str):
         )
 
 
-def authenticate_user(db, username: str, password: str):
-    user = get_user(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await hashing_pool.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
+        user.hashed_password = new_hash
+
     return user
 
 
@@ -65,11 +64,24 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-async def get_current_user(*, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def get_current_user(*, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    with span('auth'):
+        return await resolve_current_user(db, token)
+
+
+async def resolve_current_user(db: AsyncSession, token: str):
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -81,10 +93,11 @@ async def get_current_user(*, db: Session = Depends(get_db), token: str = Depend
     except JWTError:
         raise EXCEPTION_COULD_NOT_VALIDATE
 
-    user = get_user(db, token_data.username)
+    user = await get_user(db, token_data.username)
     if user is None:
         raise EXCEPTION_COULD_NOT_VALIDATE
 
+    token_cache.set(token, user, payload.get("exp", 0))
     return user
 
 
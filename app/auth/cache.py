@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import event
+
+from app.instance.config import ConfigSettings
+from app.models import User
+from app.schemas.schemas import UserInDB
+
+
+class TokenCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, UserInDB]] = OrderedDict()
+        self._tokens_by_user: defaultdict[int, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> UserInDB | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                self._discard(token)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def set(self, token: str, user: UserInDB, token_exp: float):
+        lifetime = min(self.ttl, token_exp - time.time())
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (time.monotonic() + lifetime, user)
+            self._tokens_by_user[user.id].add(token)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _discard(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+
+        user_id = entry[1].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+token_cache = TokenCache(
+    maxsize=ConfigSettings.TOKEN_CACHE_MAXSIZE,
+    ttl=ConfigSettings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+# Only ORM flushes in this process reach these hooks; TOKEN_CACHE_TTL_SECONDS bounds everything else.
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    token_cache.invalidate_user(target.id)
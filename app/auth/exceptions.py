@@ -13,4 +13,10 @@ EXCEPTION_COULD_NOT_VALIDATE = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
-EXCEPTION_INACTIVE_USER = HTTPException(status_code=400, detail="Inactive user")
\ No newline at end of file
+EXCEPTION_INACTIVE_USER = HTTPException(status_code=400, detail="Inactive user")
+
+EXCEPTION_HASHING_OVERLOADED = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many concurrent password operations, try again later",
+    headers={"Retry-After": "1"},
+)
@@ -0,0 +1,49 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.auth.exceptions import EXCEPTION_HASHING_OVERLOADED
+from app.auth.passwords import get_password_hash, verify_and_update_password
+from app.instance.config import ConfigSettings
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise EXCEPTION_HASHING_OVERLOADED
+
+        if self._executor is None:
+            # Forking a threaded server can copy locks held by other threads into the child. Spawned
+            # workers only import app.auth.passwords, which has no import-time setup.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    workers=ConfigSettings.HASHING_POOL_WORKERS,
+    max_pending=ConfigSettings.HASHING_POOL_MAX_PENDING,
+)
@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from app.instance.config import ConfigSettings
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=ConfigSettings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=ConfigSettings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=ConfigSettings.BCRYPT_ROUNDS,
+    )
+
+
+def verify_password(plain_password, hashed_password):
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password, hashed_password):
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+def get_password_hash(password):
+    return get_pwd_context().hash(password)
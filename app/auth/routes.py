@@ -1,10 +1,10 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.resources import Tags
 
-from app.services.database import get_db
+from app.services.database import get_async_db
 from app.auth.authentication import (
     ACCESS_TOKEN_EXPIRE_MINUTES, 
     authenticate_user, 
@@ -16,8 +16,8 @@ auth_router = APIRouter()
 
 
 @auth_router.post('/token', tags=[Tags.Auth])
-async def login_for_access_token(*, db: Session = Depends(get_db),form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(*, db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise EXCEPTION_INCORRECT_USER_OR_PASSWORD
 
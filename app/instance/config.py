@@ -9,11 +9,143 @@ class Settings(BaseSettings):
     DATABASE_NAME = 'library'
     DATABASE_URL = f'postgresql://{DATABASE_USER}:{DATABASE_PASS}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}'
 
+    # Comma-separated read replica URLs. GET requests are routed to them round-robin unless the
+    # client wrote within READ_YOUR_WRITES_SECONDS (tracked by cookie or X-Primary-Until header).
+    # READ_YOUR_WRITES_SECONDS is the maximum replica lag the app assumes; cached responses read
+    # from a replica expire after it.
+    DATABASE_REPLICA_URLS = ''
+    REPLICA_HEALTH_CHECK_INTERVAL = 5
+    READ_YOUR_WRITES_SECONDS = 5
+    READ_YOUR_WRITES_COOKIE = 'primary_until'
+
+    # Connection Pool Settings. When DB_CONNECTION_BUDGET is set, pool size and overflow
+    # are derived from it and WEB_CONCURRENCY instead of DB_POOL_SIZE/DB_MAX_OVERFLOW.
+    DB_POOL_SIZE = 5
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_PRE_PING = True
+    DB_POOL_TIMEOUT = 30
+    DB_STATEMENT_TIMEOUT_MS = 0
+    DB_CONNECTION_BUDGET = 0
+    DB_ASYNC_POOL_SHARE = 0.25
+    WEB_CONCURRENCY = 1
+    DB_POOL_WARM_CONNECTIONS = 1
+
+    # Startup Settings. With SCHEMA_VERSION_CHECK, workers skip create_all when the stored
+    # schema fingerprint matches the models.
+    SCHEMA_VERSION_CHECK = True
+    SERVER_HOST = '0.0.0.0'
+    SERVER_PORT = 8000
+    SERVER_PRELOAD = False
+    SERVER_TIMEOUT = 30
+
     # App Settings
     APP_NAME = 'Library API'
     APP_TITLE = 'Library API'
     APP_VERSION = '0.1.0'
     APP_DESCRIPTION = 'A simple Library API implementation'
 
+    # Auth Settings. Each worker caches the user behind a token for TOKEN_CACHE_TTL_SECONDS.
+    # ORM updates in the same worker evict the entry early, but Core UPDATE/DELETE statements and
+    # writes from other workers do not, so this TTL bounds how long a deactivated or deleted user
+    # keeps authenticating.
+    TOKEN_CACHE_MAXSIZE = 10_000
+    TOKEN_CACHE_TTL_SECONDS = 15
+    BCRYPT_ROUNDS = 12
+    HASHING_POOL_WORKERS = 2
+    HASHING_POOL_MAX_PENDING = 64
+
+    # Response Cache Settings. The memory backend keys entries by per-entity invalidation
+    # counters; with WEB_CONCURRENCY > 1 those live in shared memory (RESPONSE_CACHE_SHM_NAME)
+    # so a write in one worker invalidates the entries of every worker on the host.
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_BACKEND = 'memory'
+    RESPONSE_CACHE_URL: str | None = None
+    RESPONSE_CACHE_MAXSIZE = 10_000
+    RESPONSE_CACHE_TTL_SECONDS = 300
+    RESPONSE_CACHE_SHM_NAME = 'library_cache_versions'
+
+    # Serialization Settings
+    FAST_SERIALIZATION = False
+
+    # Bulk Import Settings
+    BULK_DEFAULT_BATCH_SIZE = 1_000
+    BULK_MAX_BATCH_SIZE = 5_000
+
+    # Group Commit Settings. When enabled, concurrent POST /books/ and POST /authors/ calls wait
+    # up to GROUP_COMMIT_WINDOW_MS (or until GROUP_COMMIT_MAX_BATCH rows are queued) and are
+    # validated and written together in one transaction through the bulk import path.
+    GROUP_COMMIT_ENABLED = False
+    GROUP_COMMIT_WINDOW_MS = 5
+    GROUP_COMMIT_MAX_BATCH = 200
+
+    # Cascade Delete Settings. Deleting an author, category or publisher removes its books in
+    # chunks of CASCADE_DELETE_CHUNK_SIZE, committing (and optionally pausing) between chunks.
+    CASCADE_DELETE_CHUNK_SIZE = 1_000
+    CASCADE_DELETE_PAUSE_MS = 0
+
+    # Job Settings. Background jobs run on JOB_WORKERS threads, separate from the request
+    # threadpool. Handlers pause JOB_THROTTLE_MS between chunks and wait (up to
+    # JOB_YIELD_MAX_SECONDS) while more than JOB_YIELD_IN_FLIGHT requests are in progress.
+    # Running jobs heartbeat every JOB_HEARTBEAT_SECONDS; a job without one for
+    # JOB_STALE_SECONDS is treated as abandoned and claimed again.
+    JOBS_ENABLED = True
+    JOB_WORKERS = 1
+    JOB_POLL_INTERVAL = 2
+    JOB_MAX_QUEUED = 100
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_BACKOFF_SECONDS = 5
+    JOB_STALE_SECONDS = 300
+    JOB_HEARTBEAT_SECONDS = 30
+    JOB_THROTTLE_MS = 10
+    JOB_YIELD_IN_FLIGHT = 8
+    JOB_YIELD_MAX_SECONDS = 5
+
+    # Change Feed Settings. Every catalog write appends to the changes outbox, numbered in
+    # commit order. The compact_changes job drops superseded entries and entries older
+    # than CHANGES_RETENTION_SECONDS; cursors behind the compacted range get resync_required.
+    CHANGES_RETENTION_SECONDS = 7 * 24 * 3600
+    CHANGES_STREAM_POLL_INTERVAL = 1
+    CHANGES_STREAM_KEEPALIVE_SECONDS = 15
+
+    # Reference Snapshot Settings. Author, category and publisher names for books come from an
+    # in-memory id -> name snapshot instead of joins; unknown ids fall back to the database.
+    # Writes apply to the snapshot as they commit; other writers' changes are picked up from the
+    # change feed at most every REFERENCE_SNAPSHOT_REFRESH_SECONDS, with a full reload every
+    # REFERENCE_SNAPSHOT_RELOAD_SECONDS. With REFERENCE_SNAPSHOT_SHARED (implied when
+    # WEB_CONCURRENCY > 1), workers on a host share one packed copy in shared memory, so a
+    # rename is visible to all of them at once. Snapshots whose packed size exceeds
+    # REFERENCE_SNAPSHOT_MAX_BYTES are disabled.
+    REFERENCE_SNAPSHOT_ENABLED = True
+    REFERENCE_SNAPSHOT_SHARED = False
+    REFERENCE_SNAPSHOT_SHM_NAME = 'library_references'
+    REFERENCE_SNAPSHOT_REFRESH_SECONDS = 5
+    REFERENCE_SNAPSHOT_RELOAD_SECONDS = 300
+    REFERENCE_SNAPSHOT_MAX_BYTES = 16 * 1024 * 1024
+
+    # Export Settings
+    EXPORT_BATCH_SIZE = 1_000
+
+    # Pagination Settings
+    PAGE_DEFAULT_LIMIT = 50
+    PAGE_MAX_LIMIT = 500
+
+    # Embedding Settings (?include=books&books_limit=N on author/category/publisher reads)
+    EMBED_BOOKS_DEFAULT_LIMIT = 10
+    EMBED_BOOKS_MAX_LIMIT = 100
+
+    # Metrics Settings. With several workers, point METRICS_MULTIPROC_DIR at a shared directory:
+    # each worker writes a snapshot there at most every METRICS_FLUSH_INTERVAL seconds and
+    # /metrics merges them.
+    METRICS_ENABLED = True
+    METRICS_MULTIPROC_DIR = ''
+    METRICS_FLUSH_INTERVAL = 5
+
+    # Profiling Settings. Adds a Server-Timing header to every response and logs slow or
+    # repeated statements; leave disabled in production.
+    PROFILING_ENABLED = False
+    SLOW_QUERY_THRESHOLD_MS = 100
+    N_PLUS_ONE_THRESHOLD = 5
+
 
 ConfigSettings = Settings()
\ No newline at end of file
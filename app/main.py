@@ -1,4 +1,26 @@
-from app import app
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import json
+import logging
+import os
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+
+from app.auth.hashing import hashing_pool
+from app.instance.config import ConfigSettings
+from app.services.cache import ResponseCacheMiddleware, response_cache
+from app.services.database import SessionLocal, async_engine, create_db_and_tables, engine, replica_set
+from app.services.database.pool import pool_stats, warm_async_pool, warm_pool
+from app.services.database.replicas import ReadYourWritesMiddleware
+from app.services.jobs import job_runner
+from app.services.jobs.kinds import JOB_KINDS
+from app.services.metrics import MetricsMiddleware, collect_metrics, multiprocess_store
+from app.services.profiling import ProfilingMiddleware, install_profiling
+from app.services.references import reference_data
 
 from app.auth.routes import auth_router
 from app.resources.authors.routes import authors_router
@@ -6,6 +28,69 @@ from app.resources.categories.routes import categories_router
 from app.resources.publishers.routes import publishers_router
 from app.resources.books.routes import books_router
 from app.resources.users.routes import users_router
+from app.resources.search.routes import search_router
+from app.resources.changes.routes import changes_router
+from app.resources.jobs.routes import jobs_router
+
+
+logger = logging.getLogger('app.startup')
+startup_timings = {}
+
+app = FastAPI(
+    name=ConfigSettings.APP_NAME,
+    title=ConfigSettings.APP_TITLE,
+    version=ConfigSettings.APP_VERSION,
+    description=ConfigSettings.APP_DESCRIPTION,
+)
+
+if ConfigSettings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware)
+
+if replica_set.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+if ConfigSettings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if ConfigSettings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.on_event("startup")
+async def on_startup():
+    started = time.perf_counter()
+    startup_timings['import_seconds'] = round(started - IMPORT_STARTED, 3)
+
+    startup_timings['schema_created'] = create_db_and_tables()
+    warm_pool(engine, ConfigSettings.DB_POOL_WARM_CONNECTIONS)
+    await warm_async_pool(async_engine, ConfigSettings.DB_POOL_WARM_CONNECTIONS)
+    if ConfigSettings.PROFILING_ENABLED:
+        install_profiling(app)
+    if ConfigSettings.REFERENCE_SNAPSHOT_ENABLED:
+        reference_data.open(
+            ConfigSettings.REFERENCE_SNAPSHOT_SHARED or ConfigSettings.WEB_CONCURRENCY > 1,
+            ConfigSettings.REFERENCE_SNAPSHOT_SHM_NAME,
+            ConfigSettings.REFERENCE_SNAPSHOT_MAX_BYTES,
+        )
+        with SessionLocal() as db:
+            reference_data.refresh(db)
+    if ConfigSettings.JOBS_ENABLED:
+        job_runner.start(app, JOB_KINDS)
+
+    startup_timings['startup_seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(json.dumps({'event': 'startup', 'pid': os.getpid(), **startup_timings}))
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    hashing_pool.shutdown()
+    job_runner.stop(timeout=ConfigSettings.JOB_POLL_INTERVAL)
+    reference_data.close()
+    response_cache.close()
+    if multiprocess_store is not None:
+        multiprocess_store.flush(force=True)
+    await async_engine.dispose()
+
 
 app.include_router(auth_router)
 app.include_router(authors_router)
@@ -13,8 +98,34 @@ app.include_router(categories_router)
 app.include_router(publishers_router)
 app.include_router(books_router)
 app.include_router(users_router)
+app.include_router(search_router)
+app.include_router(changes_router)
+app.include_router(jobs_router)
 
 
 @app.get('/health_check')
 def get_healthy_check():
     return {'message': 'Up and running :)'}
+
+
+@app.get('/health_check/ready')
+def get_readiness_check():
+    try:
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except Exception:
+        raise HTTPException(status_code=503, detail='Database unavailable')
+
+    return {
+        'message': 'Ready',
+        'pools': {
+            'primary': pool_stats(engine),
+            'async': pool_stats(async_engine.sync_engine),
+        },
+        'startup': startup_timings,
+    }
+
+
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(collect_metrics(), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,77 @@
+import importlib
+import pkgutil
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+
+from app.migrations import versions
+
+
+migrations_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations',
+    migrations_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String, nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: callable
+    transactional: bool
+
+
+def load_migrations() -> list[Migration]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f'{versions.__name__}.{module_info.name}')
+        migrations.append(Migration(
+            version=module.VERSION,
+            name=module_info.name,
+            upgrade=module.upgrade,
+            transactional=getattr(module, 'TRANSACTIONAL', True),
+        ))
+
+    migrations.sort(key=lambda migration: migration.version)
+    seen = [migration.version for migration in migrations]
+    if len(seen) != len(set(seen)):
+        raise RuntimeError(f'Duplicate migration versions: {seen}')
+    return migrations
+
+
+def applied_versions(engine) -> set[int]:
+    with engine.begin() as connection:
+        migrations_metadata.create_all(bind=connection)
+        return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine) -> list[Migration]:
+    applied = applied_versions(engine)
+    return [migration for migration in load_migrations() if migration.version not in applied]
+
+
+def record(connection, migration: Migration):
+    connection.execute(schema_migrations.insert().values(
+        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+    ))
+
+
+def migrate(engine) -> list[Migration]:
+    applied = []
+    for migration in pending_migrations(engine):
+        if migration.transactional:
+            with engine.begin() as connection:
+                migration.upgrade(connection)
+                record(connection, migration)
+        else:
+            with engine.connect() as connection:
+                migration.upgrade(connection.execution_options(isolation_level='AUTOCOMMIT'))
+            with engine.begin() as connection:
+                record(connection, migration)
+        applied.append(migration)
+    return applied
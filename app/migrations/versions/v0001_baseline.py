@@ -0,0 +1,10 @@
+from app.services.database import Base
+
+
+VERSION = 1
+
+
+def upgrade(connection):
+    import app.models  # noqa: F401
+
+    Base.metadata.create_all(bind=connection)
@@ -0,0 +1,15 @@
+VERSION = 2
+
+TRANSACTIONAL = False
+
+INDEXES = (
+    ('ix_books_author_id_id', 'author_id, id'),
+    ('ix_books_category_id_id', 'category_id, id'),
+    ('ix_books_publisher_id_id', 'publisher_id, id'),
+)
+
+
+def upgrade(connection):
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    for name, columns in INDEXES:
+        connection.exec_driver_sql(f'CREATE INDEX {concurrently}IF NOT EXISTS {name} ON books ({columns})')
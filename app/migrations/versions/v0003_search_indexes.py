@@ -0,0 +1,22 @@
+from app.models import SEARCHABLE_TABLES, search_document_sql
+
+
+VERSION = 3
+
+TRANSACTIONAL = False
+
+
+def upgrade(connection):
+    if connection.dialect.name != 'postgresql':
+        return
+
+    connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, columns in SEARCHABLE_TABLES.items():
+        connection.exec_driver_sql(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table.name}_name_trgm '
+            f'ON {table.name} USING gin (name gin_trgm_ops)'
+        )
+        connection.exec_driver_sql(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table.name}_search_tsv '
+            f"ON {table.name} USING gin (to_tsvector('simple', {search_document_sql(columns)}))"
+        )
@@ -0,0 +1,23 @@
+VERSION = 4
+
+TRANSACTIONAL = False
+
+FOREIGN_KEYS = (
+    ('books_author_id_fkey', 'author_id', 'authors'),
+    ('books_category_id_fkey', 'category_id', 'categories'),
+    ('books_publisher_id_fkey', 'publisher_id', 'publishers'),
+)
+
+
+def upgrade(connection):
+    # SQLite cannot alter constraints in place; new SQLite databases get ON DELETE CASCADE
+    # from the models and existing ones keep relying on the chunked deletes.
+    if connection.dialect.name != 'postgresql':
+        return
+
+    for name, column, parent in FOREIGN_KEYS:
+        connection.exec_driver_sql(
+            f'ALTER TABLE books DROP CONSTRAINT IF EXISTS {name}, '
+            f'ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {parent} (id) ON DELETE CASCADE NOT VALID'
+        )
+        connection.exec_driver_sql(f'ALTER TABLE books VALIDATE CONSTRAINT {name}')
@@ -0,0 +1,15 @@
+from sqlalchemy import inspect
+
+
+VERSION = 5
+
+TRANSACTIONAL = False
+
+
+def upgrade(connection):
+    # Databases created before the change feed get the whole table, index included, from create_all.
+    if not inspect(connection).has_table('changes'):
+        return
+
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.exec_driver_sql(f'CREATE INDEX {concurrently}IF NOT EXISTS ix_changes_entity_id ON changes (entity, id)')
@@ -0,0 +1,10 @@
+VERSION = 6
+
+
+def upgrade(connection):
+    from app.models import ChangeSequence
+    from app.services.changes import seed_change_sequence
+
+    # Change ids now come from a counter taken at commit; start it after the existing feed.
+    ChangeSequence.__table__.create(bind=connection, checkfirst=True)
+    seed_change_sequence(connection)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import DDL, JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.orm import relationship
 
 from app.services.database import Base
@@ -10,7 +10,7 @@ class Author(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
 
-    books = relationship('Book', back_populates='author', cascade="all, delete-orphan")
+    books = relationship('Book', back_populates='author', cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Book(Base):
@@ -19,14 +19,20 @@ class Book(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(String)
-    author_id = Column(Integer, ForeignKey('authors.id'))
-    category_id = Column(Integer, ForeignKey('categories.id'))
-    publisher_id = Column(Integer, ForeignKey('publishers.id'))
+    author_id = Column(Integer, ForeignKey('authors.id', ondelete='CASCADE'))
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'))
+    publisher_id = Column(Integer, ForeignKey('publishers.id', ondelete='CASCADE'))
 
     author = relationship('Author', back_populates='books')
     category = relationship('Category', back_populates='books')
     publisher = relationship('Publisher', back_populates='books')
 
+    __table_args__ = (
+        Index('ix_books_author_id_id', 'author_id', 'id'),
+        Index('ix_books_category_id_id', 'category_id', 'id'),
+        Index('ix_books_publisher_id_id', 'publisher_id', 'id'),
+    )
+
 
 class Category(Base):
     __tablename__ = 'categories'
@@ -35,7 +41,7 @@ class Category(Base):
     name = Column(String, unique=True, index=True)
     description = Column(String)
 
-    books = relationship('Book', back_populates='category', cascade="all, delete-orphan")
+    books = relationship('Book', back_populates='category', cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Publisher(Base):
@@ -45,7 +51,7 @@ class Publisher(Base):
     name = Column(String, unique=True, index=True)
     description = Column(String)
 
-    books = relationship('Book', back_populates='publisher', cascade="all, delete-orphan")
+    books = relationship('Book', back_populates='publisher', cascade="all, delete-orphan", passive_deletes=True)
 
 
 class User(Base):
@@ -55,3 +61,98 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+
+
+class BookFacetCount(Base):
+    __tablename__ = 'book_facet_counts'
+
+    facet = Column(String, primary_key=True)
+    value_id = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    __tablename__ = 'jobs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default='queued')
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    error = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    run_after = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+
+class Change(Base):
+    __tablename__ = 'changes'
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    data = Column(JSON)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_changes_entity_entity_id_id', 'entity', 'entity_id', 'id'),
+        Index('ix_changes_entity_id', 'entity', 'id'),
+        Index('ix_changes_created_at', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+
+class ChangeSequence(Base):
+    __tablename__ = 'change_sequence'
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False)
+
+
+class ChangeCompaction(Base):
+    __tablename__ = 'change_compactions'
+
+    id = Column(Integer, primary_key=True)
+    compacted_through = Column(Integer, nullable=False)
+    compacted_at = Column(DateTime, nullable=False)
+
+
+SEARCHABLE_TABLES = {
+    Author.__table__: ('name',),
+    Book.__table__: ('name', 'description'),
+    Category.__table__: ('name', 'description'),
+    Publisher.__table__: ('name', 'description'),
+}
+
+
+def search_document_sql(columns):
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+
+event.listen(
+    Base.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+)
+
+for table, columns in SEARCHABLE_TABLES.items():
+    event.listen(table, 'after_create', DDL(
+        f'CREATE INDEX IF NOT EXISTS ix_{table.name}_name_trgm '
+        f'ON {table.name} USING gin (name gin_trgm_ops)'
+    ).execute_if(dialect='postgresql'))
+    event.listen(table, 'after_create', DDL(
+        f'CREATE INDEX IF NOT EXISTS ix_{table.name}_search_tsv '
+        f"ON {table.name} USING gin (to_tsvector('simple', {search_document_sql(columns)}))"
+    ).execute_if(dialect='postgresql'))
@@ -7,4 +7,7 @@ class Tags(Enum):
     Publishers = 'Publishers'
     Books = 'Books'
     Users = 'Users'
+    Search = 'Search'
+    Changes = 'Changes'
+    Jobs = 'Jobs'
     Auth = 'Auth'
\ No newline at end of file
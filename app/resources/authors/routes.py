@@ -1,16 +1,45 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.auth.oauth2 import oauth2_scheme
-from app.schemas.schemas import AuthorCreate, AuthorRead, AuthorUpdate
-from app.models import Author
-from app.services.database import get_db
+from app.instance.config import ConfigSettings
+from app.schemas.schemas import BulkImportReport, AuthorCreate, AuthorRead, AuthorUpdate, Page
+from app.models import Book, Author
+from app.services.cache import response_cache
+from app.services.cascade import delete_with_books
+from app.services.changes import ChangeOp, record_change
+from app.services.bulk import AUTHORS_IMPORT, BulkOptions, bulk_import
+from app.services.database import SessionLocal, get_async_db, get_db
+from app.services.database.writes import insert_returning, integrity_error_detail, update_returning
+from app.services.export import ExportFormat, stream_export
+from app.services.group_commit import author_commits
 from app.resources import Tags
+from app.resources.fieldsets import FieldsetParams, embed_books
+from app.resources.pagination import PageParams, paginate
+from app.schemas.serializers import render_item, render_page
 
 
 authors_router = APIRouter(prefix='/authors')
 
+AUTHOR_CONSTRAINT_ERRORS = {'ix_authors_name': "Author already exists."}
+
+
+def insert_author(db: Session, author: AuthorCreate):
+    try:
+        new_author = insert_returning(db, Author, author.dict())
+        record_change(db, 'authors', ChangeOp.created, new_author)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, AUTHOR_CONSTRAINT_ERRORS))
+
+    response_cache.invalidate('authors')
+    return {**new_author, 'books': []}
+
 
 @authors_router.post(
     '/', 
@@ -20,18 +49,41 @@ authors_router = APIRouter(prefix='/authors')
     tags=[Tags.Authors],
     dependencies=[Depends(oauth2_scheme)]
 )
-def create_author(*, db: Session = Depends(get_db), author: AuthorCreate):
-    try:
-        new_author = Author(name=author.name)
-        db.add(new_author)
-        db.commit()
-        db.refresh(new_author)
+async def create_author(*, author: AuthorCreate):
+    if ConfigSettings.GROUP_COMMIT_ENABLED:
+        return {**await author_commits.submit(author.dict()), 'books': []}
 
-        return new_author
-    except IntegrityError:
-        db.rollback()
-        db.close()
-        raise HTTPException(status_code=400, detail="Author already exists.")
+    def run():
+        with SessionLocal() as db:
+            return insert_author(db, author)
+
+    return await run_in_threadpool(run)
+
+
+@authors_router.post(
+    '/bulk',
+    response_model=BulkImportReport,
+    tags=[Tags.Authors],
+    dependencies=[Depends(oauth2_scheme)]
+)
+async def bulk_import_authors(
+    *, db: AsyncSession = Depends(get_async_db), request: Request, options: BulkOptions = Depends()
+):
+    return await bulk_import(db, request, AUTHORS_IMPORT, options)
+
+
+@authors_router.get('/export', tags=[Tags.Authors])
+def export_authors(
+    *,
+    db: Session = Depends(get_db),
+    name: str | None = Query(None, min_length=3, max_length=20),
+    format: ExportFormat = ExportFormat.ndjson
+):
+    statement = select(Author.id, Author.name).order_by(Author.id)
+    if name:
+        statement = statement.filter(Author.name.ilike('%' + name + '%'))
+
+    return stream_export(db, statement, format, 'authors')
 
 
 @authors_router.get(
@@ -40,30 +92,35 @@ def create_author(*, db: Session = Depends(get_db), author: AuthorCreate):
     response_model_exclude_none=True,
     tags=[Tags.Authors]
 )
-def get_author_by_id(*, db: Session = Depends(get_db), author_id: int):
-    author = db.query(Author).filter(Author.id == author_id).first()
+def get_author_by_id(*, db: Session = Depends(get_db), author_id: int, fieldset: FieldsetParams = Depends()):
+    author = db.query(*fieldset.columns(Author, AuthorRead)).filter(Author.id == author_id).first()
 
     if not author:
         raise HTTPException(status_code=404, detail="Author not found.")
 
-    return author
+    return render_item(AuthorRead, fieldset.expand(db, [author], Book.author_id)[0])
 
 
 @authors_router.get(
     '/', 
-    response_model=list[AuthorRead], 
+    response_model=Page[AuthorRead], 
     response_model_exclude_none=True,
     tags=[Tags.Authors]
 )
 def get_all_authors(
     *, 
     db: Session = Depends(get_db), 
+    page: PageParams = Depends(),
+    fieldset: FieldsetParams = Depends(),
     name: str | None = Query(None, min_length=3, max_length=20)
 ):
+    base_query = db.query(*fieldset.columns(Author, AuthorRead))
     if name:
-        return db.query(Author).filter(Author.name.ilike('%' + name + '%')).all()
-    
-    return db.query(Author).all()
+        base_query = base_query.filter(Author.name.ilike('%' + name + '%'))
+
+    result = paginate(base_query, Author.id, page)
+    result['items'] = fieldset.expand(db, result['items'], Book.author_id)
+    return render_page(AuthorRead, result)
 
 
 @authors_router.patch(
@@ -74,25 +131,26 @@ def get_all_authors(
     dependencies=[Depends(oauth2_scheme)]
 )
 def update_author(*, db: Session = Depends(get_db), author_id: int, author: AuthorUpdate):
-    db_author = db.get(Author, author_id)
-    if not author:
+    try:
+        db_author = update_returning(db, Author, author_id, author.dict(exclude_unset=True))
+        if db_author:
+            record_change(db, 'authors', ChangeOp.updated, db_author)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, AUTHOR_CONSTRAINT_ERRORS))
+
+    if not db_author:
         raise HTTPException(status_code=404, detail="Author not found")
-    
-    author_data = author.dict(exclude_unset=True)
-    for key, value in author_data.items():
-            setattr(db_author, key, value)
-    db.add(db_author)
-    db.commit()
-    db.refresh(db_author)
+
+    response_cache.invalidate('authors')
+    embed_books(db, [db_author], Book.author_id, ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT)
     return db_author
 
 
 @authors_router.delete('/{author_id}', tags=[Tags.Authors], dependencies=[Depends(oauth2_scheme)])
 def delete_author(*, db: Session = Depends(get_db), author_id: int):
-    author = db.get(Author, author_id)
-    if not author:
+    result = delete_with_books(db, Author, author_id, Book.author_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    
-    db.delete(author)
-    db.commit()
-    return {'ok': True}
+    return result
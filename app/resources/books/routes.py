@@ -1,17 +1,161 @@
-from typing import List
-from fastapi import Depends, APIRouter, HTTPException, Query, status
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.schemas.schemas import BookCreate, BookReadWithAuthor, BookUpdate
+from app.schemas.schemas import BulkImportReport, BookCreate, BookFacets, BookReadWithAuthor, BookUpdate, Page
 from app.auth.oauth2 import oauth2_scheme
-from app.services.database import get_db
+from app.instance.config import ConfigSettings
+from app.services.cache import response_cache
+from app.services.changes import ChangeOp, record_change
+from app.services.bulk import BOOKS_IMPORT, BulkOptions, bulk_import
+from app.services.database import SessionLocal, get_async_db, get_db
+from app.services.database.writes import (
+    FOREIGN_KEY_VIOLATION,
+    constraint_name,
+    integrity_error_detail,
+    supports_returning,
+)
+from app.services.export import ExportFormat, stream_export
+from app.services.group_commit import book_commits
+from app.services.references import reference_data
+from app.services.facets import (
+    FACET_COLUMNS,
+    apply_facet_deltas,
+    changed_facet_deltas,
+    facet_deltas,
+    filtered_facet_counts,
+    stored_facet_counts,
+)
 from app.resources import Tags
+from app.resources.pagination import PageParams, paginate
+from app.schemas.loaders import load_for, select_book_with_names
+from app.schemas.serializers import render_page
 from app.models import Author, Book, Category, Publisher
 
 
 books_router = APIRouter(prefix='/books')
 
 
+class BookFilters:
+    def __init__(
+        self,
+        name: str | None = Query(None, min_length=3, max_length=20),
+        author_id: int | None = Query(None),
+        category_id: int | None = Query(None),
+        publisher_id: int | None = Query(None),
+    ):
+        self.name = name
+        self.author_id = author_id
+        self.category_id = category_id
+        self.publisher_id = publisher_id
+
+    @property
+    def active(self) -> bool:
+        return any((self.name, self.author_id, self.category_id, self.publisher_id))
+
+    def apply(self, query):
+        if self.name:
+            query = query.filter(Book.name.ilike('%' + self.name + '%'))
+
+        if self.author_id:
+            query = query.filter(Book.author_id == self.author_id)
+
+        if self.category_id:
+            query = query.filter(Book.category_id == self.category_id)
+
+        if self.publisher_id:
+            query = query.filter(Book.publisher_id == self.publisher_id)
+
+        return query
+
+
+BOOK_CONSTRAINT_ERRORS = {
+    'ix_books_name': "Book already exists.",
+    'books_author_id_fkey': "Author not found.",
+    'books_category_id_fkey': "Category not found.",
+    'books_publisher_id_fkey': "Publisher not found.",
+}
+
+BOOK_REFERENCES = (
+    ('author_id', Author, "Author not found."),
+    ('category_id', Category, "Category not found."),
+    ('publisher_id', Publisher, "Publisher not found."),
+)
+
+
+def with_reference_names(db: Session, rows) -> list[dict]:
+    rows = [dict(getattr(row, '_mapping', row)) for row in rows]
+    for column, model, _ in BOOK_REFERENCES:
+        names = reference_data.names(db, model, {row[column] for row in rows if row[column] is not None})
+        for row in rows:
+            row[f'{column[:-3]}_name'] = names.get(row[column])
+    return rows
+
+
+def write_book(db: Session, statement, book_id: int | None = None):
+    if supports_returning(db):
+        written = statement.returning(*Book.__table__.c)
+        if reference_data.available:
+            row = db.execute(written).first()
+            return with_reference_names(db, [row])[0] if row else None
+        row = db.execute(select_book_with_names(written.cte('written'))).first()
+        return row._mapping if row else None
+
+    result = db.execute(statement)
+    if book_id is None:
+        book_id = result.inserted_primary_key[0]
+    elif not result.rowcount:
+        return None
+
+    if reference_data.available:
+        return with_reference_names(db, [db.execute(select(Book.__table__).where(Book.id == book_id)).one()])[0]
+    return db.execute(select_book_with_names(Book.__table__).where(Book.id == book_id)).one()._mapping
+
+
+def book_response(row) -> dict:
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'description': row['description'],
+        'author': {'id': row['author_id'], 'name': row['author_name']},
+        'category': {'id': row['category_id'], 'name': row['category_name']},
+        'publisher': {'id': row['publisher_id'], 'name': row['publisher_name']},
+    }
+
+
+def book_integrity_error_detail(db: Session, exc: IntegrityError, values: dict) -> str:
+    if constraint_name(exc) != FOREIGN_KEY_VIOLATION:
+        return integrity_error_detail(exc, BOOK_CONSTRAINT_ERRORS)
+
+    for column, model, detail in BOOK_REFERENCES:
+        if column in values and db.get(model, values[column]) is None:
+            return detail
+    raise exc
+
+
+def insert_book(db: Session, book: BookCreate):
+    values = book.dict()
+    if reference_data.available:
+        for column, model, detail in BOOK_REFERENCES:
+            if not reference_data.exists(db, model, values[column]):
+                raise HTTPException(status_code=400, detail=detail)
+
+    try:
+        new_book = write_book(db, insert(Book).values(**values))
+        apply_facet_deltas(db, facet_deltas([values]))
+        record_change(db, 'books', ChangeOp.created, new_book)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=book_integrity_error_detail(db, e, values))
+
+    response_cache.invalidate('books')
+    return book_response(new_book)
+
+
 @books_router.post(
     '/', 
     response_model=BookReadWithAuthor, 
@@ -20,39 +164,59 @@ books_router = APIRouter(prefix='/books')
     tags=[Tags.Books],
     dependencies=[Depends(oauth2_scheme)]
 )
-def create_book(*, db: Session = Depends(get_db), book: BookCreate):
-    db_book = db.query(Book).filter(Book.name == book.name).first()
-    if db_book:
-        raise HTTPException(status_code=400, detail="Book already exists.")
+async def create_book(*, book: BookCreate):
+    if ConfigSettings.GROUP_COMMIT_ENABLED:
+        return book_response(await book_commits.submit(book.dict()))
 
-    db_author = db.query(Author).filter(Author.id == book.author_id).first()
-    if not db_author:
-        raise HTTPException(status_code=400, detail="Author not found.")
+    def run():
+        with SessionLocal() as db:
+            return insert_book(db, book)
 
-    db_category = db.query(Category).filter(Category.id == book.category_id).first()
-    if not db_category:
-        raise HTTPException(status_code=400, detail="Category not found.")
+    return await run_in_threadpool(run)
 
-    db_publisher = db.query(Publisher).filter(Publisher.id == book.publisher_id).first()
-    if not db_publisher:
-        raise HTTPException(status_code=400, detail="Publisher not found.")
 
-    try:
-        new_book = Book(
-            name=book.name, 
-            description=book.description, 
-            author_id=book.author_id,
-            category_id=book.category_id,
-            publisher_id=book.publisher_id,
+@books_router.post(
+    '/bulk',
+    response_model=BulkImportReport,
+    tags=[Tags.Books],
+    dependencies=[Depends(oauth2_scheme)]
+)
+async def bulk_import_books(
+    *, db: AsyncSession = Depends(get_async_db), request: Request, options: BulkOptions = Depends()
+):
+    return await bulk_import(db, request, BOOKS_IMPORT, options)
+
+
+@books_router.get('/export', tags=[Tags.Books])
+def export_books(
+    *, db: Session = Depends(get_db), filters: BookFilters = Depends(), format: ExportFormat = ExportFormat.ndjson
+):
+    statement = filters.apply(
+        select(
+            Book.id,
+            Book.name,
+            Book.description,
+            Book.author_id,
+            Author.name.label('author_name'),
+            Book.category_id,
+            Category.name.label('category_name'),
+            Book.publisher_id,
+            Publisher.name.label('publisher_name'),
         )
-        db.add(new_book)
-        db.commit()
-        db.refresh(new_book)
+        .join(Book.author)
+        .join(Book.category)
+        .join(Book.publisher)
+        .order_by(Book.id)
+    )
+    return stream_export(db, statement, format, 'books')
+
+
+@books_router.get('/facets', response_model=BookFacets, tags=[Tags.Books])
+def get_book_facets(*, db: Session = Depends(get_db), filters: BookFilters = Depends()):
+    if filters.active:
+        return filtered_facet_counts(db, filters)
+    return stored_facet_counts(db)
 
-        return new_book
-    except Exception as e:
-        print(e)
-        raise HTTPException(status_code=500, detail="Something went wrong.")
 
 @books_router.get(
     '/{book_id}', 
@@ -61,7 +225,13 @@ def create_book(*, db: Session = Depends(get_db), book: BookCreate):
     tags=[Tags.Books]
 )
 def get_book_by_id(*, db: Session = Depends(get_db), book_id: int):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    if reference_data.available:
+        row = db.execute(select(Book.__table__).where(Book.id == book_id)).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Book not found.")
+        return book_response(with_reference_names(db, [row])[0])
+
+    book = load_for(db.query(Book), BookReadWithAuthor).filter(Book.id == book_id).first()
 
     if not book:
         raise HTTPException(status_code=404, detail="Book not found.")
@@ -71,31 +241,22 @@ def get_book_by_id(*, db: Session = Depends(get_db), book_id: int):
 
 @books_router.get(
     '/', 
-    response_model=List[BookReadWithAuthor], 
+    response_model=Page[BookReadWithAuthor], 
     response_model_exclude_none=True,
     tags=[Tags.Books]
 )
 def get_all_books(
     *, db: Session = Depends(get_db), 
-    name: str | None = Query(None, min_length=3, max_length=20),
-    author_id: int | None = Query(None),
-    category_id: int | None = Query(None),
-    publisher_id: int | None = Query(None),
+    page: PageParams = Depends(),
+    filters: BookFilters = Depends(),
 ):
-    base_query = db.query(Book)
-    if name:
-        base_query = base_query.filter(Book.name.ilike('%' + name + '%'))
-
-    if author_id:
-        base_query = base_query.filter(Book.author_id == author_id)
-
-    if category_id:
-        base_query = base_query.filter(Book.category_id == category_id)
+    if reference_data.available:
+        result = paginate(filters.apply(db.query(*Book.__table__.c)), Book.id, page)
+        result['items'] = [book_response(row) for row in with_reference_names(db, result['items'])]
+        return render_page(BookReadWithAuthor, result)
 
-    if publisher_id:
-        base_query = base_query.filter(Book.publisher_id == publisher_id)
-
-    return base_query.all()
+    base_query = filters.apply(load_for(db.query(Book), BookReadWithAuthor))
+    return render_page(BookReadWithAuthor, paginate(base_query, Book.id, page))
 
 
 @books_router.patch(
@@ -106,17 +267,29 @@ def get_all_books(
     dependencies=[Depends(oauth2_scheme)]
 )
 def update_book(*, db: Session = Depends(get_db), book_id: int, book: BookUpdate):
-    db_book = db.get(Book, book_id)
-    if not book:
+    values = book.dict(exclude_unset=True)
+    old_facets = None
+    if any(column in values for column in FACET_COLUMNS):
+        old_facets = db.execute(
+            select(Book.author_id, Book.category_id, Book.publisher_id).where(Book.id == book_id).with_for_update()
+        ).first()
+
+    try:
+        db_book = write_book(db, update(Book).where(Book.id == book_id).values(**values), book_id)
+        if db_book and old_facets:
+            apply_facet_deltas(db, changed_facet_deltas(old_facets, values))
+        if db_book:
+            record_change(db, 'books', ChangeOp.updated, db_book)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=book_integrity_error_detail(db, e, values))
+
+    if not db_book:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    book_data = book.dict(exclude_unset=True)
-    for key, value in book_data.items():
-            setattr(db_book, key, value)
-    db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
-    return db_book
+
+    response_cache.invalidate('books')
+    return book_response(db_book)
 
 
 @books_router.delete('/{book_id}', tags=[Tags.Books], dependencies=[Depends(oauth2_scheme)])
@@ -126,5 +299,8 @@ def delete_book(*, db: Session = Depends(get_db), book_id: int):
         raise HTTPException(status_code=404, detail="Book not found")
     
     db.delete(book)
+    apply_facet_deltas(db, facet_deltas([book], sign=-1))
+    record_change(db, 'books', ChangeOp.deleted, book)
     db.commit()
+    response_cache.invalidate('books')
     return {'ok': True}
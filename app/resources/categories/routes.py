@@ -1,16 +1,30 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.resources import Tags
-from app.schemas.schemas import CategoryCreate, CategoryRead, CategoryUpdate
+from app.resources.fieldsets import FieldsetParams, embed_books
+from app.resources.pagination import PageParams, paginate
+from app.schemas.serializers import render_item, render_page
+from app.schemas.schemas import BulkImportReport, CategoryCreate, CategoryRead, CategoryUpdate, Page
 
 from app.auth.oauth2 import oauth2_scheme
-from app.services.database import get_db
-from app.models import Category
+from app.instance.config import ConfigSettings
+from app.services.cache import response_cache
+from app.services.cascade import delete_with_books
+from app.services.changes import ChangeOp, record_change
+from app.services.bulk import CATEGORIES_IMPORT, BulkOptions, bulk_import
+from app.services.database import get_async_db, get_db
+from app.services.database.writes import insert_returning, integrity_error_detail, update_returning
+from app.services.export import ExportFormat, stream_export
+from app.models import Book, Category
 
 
 categories_router = APIRouter(prefix='/categories')
 
+CATEGORY_CONSTRAINT_ERRORS = {'ix_categories_name': "Category already exists."}
+
 
 @categories_router.post(
     '/', 
@@ -22,16 +36,41 @@ categories_router = APIRouter(prefix='/categories')
 )
 def create_category(*, db: Session = Depends(get_db), category: CategoryCreate):
     try:
-        new_category = Category(name=category.name, description=category.description)
-        db.add(new_category)
+        new_category = insert_returning(db, Category, category.dict())
+        record_change(db, 'categories', ChangeOp.created, new_category)
         db.commit()
-        db.refresh(new_category)
-
-        return new_category
-    except IntegrityError:
+    except IntegrityError as e:
         db.rollback()
-        db.close()
-        raise HTTPException(status_code=400, detail="Category already exists.")
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, CATEGORY_CONSTRAINT_ERRORS))
+
+    response_cache.invalidate('categories')
+    return {**new_category, 'books': []}
+
+
+@categories_router.post(
+    '/bulk',
+    response_model=BulkImportReport,
+    tags=[Tags.Categories],
+    dependencies=[Depends(oauth2_scheme)]
+)
+async def bulk_import_categories(
+    *, db: AsyncSession = Depends(get_async_db), request: Request, options: BulkOptions = Depends()
+):
+    return await bulk_import(db, request, CATEGORIES_IMPORT, options)
+
+
+@categories_router.get('/export', tags=[Tags.Categories])
+def export_categories(
+    *,
+    db: Session = Depends(get_db),
+    name: str | None = Query(None, min_length=3, max_length=20),
+    format: ExportFormat = ExportFormat.ndjson
+):
+    statement = select(Category.id, Category.name, Category.description).order_by(Category.id)
+    if name:
+        statement = statement.filter(Category.name.ilike('%' + name + '%'))
+
+    return stream_export(db, statement, format, 'categories')
 
 
 @categories_router.get(
@@ -40,30 +79,35 @@ def create_category(*, db: Session = Depends(get_db), category: CategoryCreate):
     response_model_exclude_none=True,
     tags=[Tags.Categories]
 )
-def get_category_by_id(*, db: Session = Depends(get_db), category_id: int):
-    category = db.query(Category).filter(Category.id == category_id).first()
+def get_category_by_id(*, db: Session = Depends(get_db), category_id: int, fieldset: FieldsetParams = Depends()):
+    category = db.query(*fieldset.columns(Category, CategoryRead)).filter(Category.id == category_id).first()
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found.")
 
-    return category
+    return render_item(CategoryRead, fieldset.expand(db, [category], Book.category_id)[0])
 
 
 @categories_router.get(
     '/', 
-    response_model=list[CategoryRead], 
+    response_model=Page[CategoryRead], 
     response_model_exclude_none=True,
     tags=[Tags.Categories]
 )
 def get_all_categories(
     *, 
     db: Session = Depends(get_db), 
+    page: PageParams = Depends(),
+    fieldset: FieldsetParams = Depends(),
     name: str | None = Query(None, min_length=3, max_length=20)
 ):
+    base_query = db.query(*fieldset.columns(Category, CategoryRead))
     if name:
-        return db.query(Category).filter(Category.name.ilike('%' + name + '%')).order_by(Category.id).all()
-    
-    return db.query(Category).all()
+        base_query = base_query.filter(Category.name.ilike('%' + name + '%'))
+
+    result = paginate(base_query, Category.id, page)
+    result['items'] = fieldset.expand(db, result['items'], Book.category_id)
+    return render_page(CategoryRead, result)
 
 
 @categories_router.patch(
@@ -74,25 +118,26 @@ def get_all_categories(
     dependencies=[Depends(oauth2_scheme)]
 )
 def update_category(*, db: Session = Depends(get_db), category_id: int, category: CategoryUpdate):
-    db_category = db.get(Category, category_id)
-    if not category:
+    try:
+        db_category = update_returning(db, Category, category_id, category.dict(exclude_unset=True))
+        if db_category:
+            record_change(db, 'categories', ChangeOp.updated, db_category)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, CATEGORY_CONSTRAINT_ERRORS))
+
+    if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    category_data = category.dict(exclude_unset=True)
-    for key, value in category_data.items():
-            setattr(db_category, key, value)
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+
+    response_cache.invalidate('categories')
+    embed_books(db, [db_category], Book.category_id, ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT)
     return db_category
 
 
 @categories_router.delete('/{category_id}', tags=[Tags.Categories], dependencies=[Depends(oauth2_scheme)])
 def delete_author(*, db: Session = Depends(get_db), category_id: int):
-    category = db.get(Category, category_id)
-    if not category:
+    result = delete_with_books(db, Category, category_id, Book.category_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    db.delete(category)
-    db.commit()
-    return {'ok': True}
+    return result
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import time
+
+from fastapi import Depends, APIRouter, Header, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+from app.schemas.schemas import ChangeFeed
+from app.services.changes import changes_since
+from app.services.database import AsyncSessionLocal, get_db
+from app.resources import Tags
+
+
+changes_router = APIRouter(prefix='/changes')
+
+
+def server_sent_event(event: str, data, id: int | None = None) -> str:
+    lines = [f'event: {event}', f'data: {json.dumps(jsonable_encoder(data))}']
+    if id is not None:
+        lines.insert(0, f'id: {id}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream_changes(request: Request, since: int, limit: int):
+    cursor = since
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+        async with AsyncSessionLocal() as db:
+            feed = await db.run_sync(changes_since, cursor, limit)
+
+        if feed['resync_required']:
+            yield server_sent_event('resync', {'next_cursor': feed['next_cursor']})
+            return
+
+        for item in feed['items']:
+            yield server_sent_event('change', item, id=item['id'])
+        cursor = feed['next_cursor']
+
+        if feed['items']:
+            last_sent = time.monotonic()
+            if feed['has_more']:
+                continue
+        elif time.monotonic() - last_sent >= ConfigSettings.CHANGES_STREAM_KEEPALIVE_SECONDS:
+            yield ': keepalive\n\n'
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(ConfigSettings.CHANGES_STREAM_POLL_INTERVAL)
+
+
+@changes_router.get('/', response_model=ChangeFeed, tags=[Tags.Changes])
+def get_changes(
+    *,
+    db: Session = Depends(get_db),
+    since: int = Query(0, ge=0),
+    limit: int = Query(ConfigSettings.PAGE_DEFAULT_LIMIT, ge=1, le=ConfigSettings.PAGE_MAX_LIMIT),
+):
+    return changes_since(db, since, limit)
+
+
+@changes_router.get('/stream', tags=[Tags.Changes])
+async def get_change_stream(
+    *,
+    request: Request,
+    since: int = Query(0, ge=0),
+    last_event_id: int | None = Header(None),
+):
+    cursor = since if last_event_id is None else last_event_id
+    return StreamingResponse(
+        stream_changes(request, cursor, ConfigSettings.PAGE_MAX_LIMIT),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'},
+    )
@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from fastapi import HTTPException, Query
+from sqlalchemy import func, select, true
+
+from app.instance.config import ConfigSettings
+from app.models import Book
+
+
+EMBEDDABLE = ('books',)
+
+
+def split_names(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class FieldsetParams:
+    def __init__(
+        self,
+        fields: str | None = Query(None, description='Comma-separated fields to return'),
+        include: str | None = Query(None, description='Comma-separated relations to embed: books'),
+        books_limit: int = Query(
+            ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT, ge=1, le=ConfigSettings.EMBED_BOOKS_MAX_LIMIT
+        ),
+    ):
+        self.fields = split_names(fields) if fields is not None else None
+        self.include = split_names(include)
+        self.books_limit = books_limit
+
+        unknown = set(self.include) - set(EMBEDDABLE)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown includes: {', '.join(sorted(unknown))}.")
+
+    def columns(self, model, schema):
+        available = [name for name in schema.__fields__ if name not in EMBEDDABLE]
+        names = available if self.fields is None else self.fields
+        unknown = set(names) - set(available)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}.")
+
+        return [model.id, *(getattr(model, name) for name in names if name != 'id')]
+
+    def expand(self, db, rows, foreign_key) -> list[dict]:
+        items = [dict(row._mapping) for row in rows]
+        if 'books' in self.include:
+            embed_books(db, items, foreign_key, self.books_limit)
+        return items
+
+
+def ranked_books(foreign_key, parent_ids: list[int], limit: int):
+    columns = Book.__table__.c
+    rank = func.row_number().over(partition_by=foreign_key, order_by=Book.id).label('rank')
+    ranked = select(*columns, rank).where(foreign_key.in_(parent_ids)).subquery()
+    return (
+        select(*(ranked.c[column.key] for column in columns))
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c[foreign_key.key], ranked.c.id)
+    )
+
+
+def lateral_books(foreign_key, parent_ids: list[int], limit: int):
+    [reference] = foreign_key.foreign_keys
+    parent = reference.column.table
+    parents = select(parent.c.id).where(parent.c.id.in_(parent_ids)).subquery('parents')
+    books = (
+        select(*Book.__table__.c)
+        .where(foreign_key == parents.c.id)
+        .order_by(Book.id)
+        .limit(limit)
+        .lateral('embedded')
+    )
+    return (
+        select(books)
+        .select_from(parents.join(books, true()))
+        .order_by(books.c[foreign_key.key], books.c.id)
+    )
+
+
+def embed_books(db, parents: list[dict], foreign_key, limit: int):
+    if not parents:
+        return
+
+    parent_ids = [parent['id'] for parent in parents]
+    # On PostgreSQL each parent reads at most `limit` rows off the foreign key index; the window
+    # function fallback ranks every book of every parent first.
+    if db.get_bind().dialect.name == 'postgresql':
+        rows = db.execute(lateral_books(foreign_key, parent_ids, limit))
+    else:
+        rows = db.execute(ranked_books(foreign_key, parent_ids, limit))
+
+    books_by_parent = defaultdict(list)
+    for book in rows.mappings():
+        books_by_parent[book[foreign_key.key]].append(dict(book))
+
+    for parent in parents:
+        parent['books'] = books_by_parent.get(parent['id'], [])
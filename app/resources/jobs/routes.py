@@ -0,0 +1,60 @@
+from fastapi import Depends, APIRouter, HTTPException, Response, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.auth.oauth2 import oauth2_scheme
+from app.instance.config import ConfigSettings
+from app.models import Job
+from app.schemas.schemas import JobCreate, JobRead
+from app.services.database import get_db
+from app.services.jobs import active_job_count, cancel_job, submit_job
+from app.services.jobs.kinds import JOB_KINDS
+from app.resources import Tags
+
+
+jobs_router = APIRouter(prefix='/jobs')
+
+
+@jobs_router.post(
+    '/',
+    response_model=JobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=[Tags.Jobs],
+    dependencies=[Depends(oauth2_scheme)]
+)
+def create_job(*, db: Session = Depends(get_db), job: JobCreate, response: Response):
+    kind = JOB_KINDS.get(job.kind)
+    if kind is None:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}.")
+
+    try:
+        params = kind.params.parse_obj(job.params)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors())
+
+    if active_job_count(db) >= ConfigSettings.JOB_MAX_QUEUED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending jobs, try again later",
+            headers={"Retry-After": str(ConfigSettings.JOB_POLL_INTERVAL)},
+        )
+
+    new_job = submit_job(db, job.kind, params.dict(), job.max_attempts)
+    response.headers['Location'] = f'/jobs/{new_job.id}'
+    return new_job
+
+
+@jobs_router.get('/{job_id}', response_model=JobRead, tags=[Tags.Jobs], dependencies=[Depends(oauth2_scheme)])
+def read_job(*, db: Session = Depends(get_db), job_id: int):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@jobs_router.delete('/{job_id}', response_model=JobRead, tags=[Tags.Jobs], dependencies=[Depends(oauth2_scheme)])
+def delete_job(*, db: Session = Depends(get_db), job_id: int):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return cancel_job(db, job)
@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Query
+
+from app.instance.config import ConfigSettings
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        last_id = json.loads(raw)['id']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    if type(last_id) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    return last_id
+
+
+class PageParams:
+    def __init__(
+        self,
+        cursor: str | None = Query(None),
+        limit: int = Query(ConfigSettings.PAGE_DEFAULT_LIMIT, ge=1, le=ConfigSettings.PAGE_MAX_LIMIT),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def paginate(query, id_column, page: PageParams):
+    if page.cursor:
+        query = query.filter(id_column > decode_cursor(page.cursor))
+
+    rows = query.order_by(id_column).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1].id)
+
+    return {'items': rows, 'next_cursor': next_cursor}
@@ -1,16 +1,30 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, status
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.schemas.schemas import PublisherCreate, PublisherRead, PublisherUpdate
+from app.schemas.schemas import BulkImportReport, PublisherCreate, PublisherRead, PublisherUpdate, Page
 
 from app.auth.oauth2 import oauth2_scheme
-from app.services.database import get_db
+from app.instance.config import ConfigSettings
+from app.services.cache import response_cache
+from app.services.cascade import delete_with_books
+from app.services.changes import ChangeOp, record_change
+from app.services.bulk import PUBLISHERS_IMPORT, BulkOptions, bulk_import
+from app.services.database import get_async_db, get_db
+from app.services.database.writes import insert_returning, integrity_error_detail, update_returning
+from app.services.export import ExportFormat, stream_export
 from app.resources import Tags
-from app.models import Publisher
+from app.resources.fieldsets import FieldsetParams, embed_books
+from app.resources.pagination import PageParams, paginate
+from app.schemas.serializers import render_item, render_page
+from app.models import Book, Publisher
 
 
 publishers_router = APIRouter(prefix='/publishers')
 
+PUBLISHER_CONSTRAINT_ERRORS = {'ix_publishers_name': "Publisher already exists."}
+
 
 @publishers_router.post(
     '/', 
@@ -22,16 +36,41 @@ publishers_router = APIRouter(prefix='/publishers')
 )
 def create_publisher(*, db: Session = Depends(get_db), publisher: PublisherCreate):
     try:
-        new_publisher = Publisher(name=publisher.name, description=publisher.description)
-        db.add(new_publisher)
+        new_publisher = insert_returning(db, Publisher, publisher.dict())
+        record_change(db, 'publishers', ChangeOp.created, new_publisher)
         db.commit()
-        db.refresh(new_publisher)
-
-        return new_publisher
-    except IntegrityError:
+    except IntegrityError as e:
         db.rollback()
-        db.close()
-        raise HTTPException(status_code=400, detail="Publisher already exists.")
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, PUBLISHER_CONSTRAINT_ERRORS))
+
+    response_cache.invalidate('publishers')
+    return {**new_publisher, 'books': []}
+
+
+@publishers_router.post(
+    '/bulk',
+    response_model=BulkImportReport,
+    tags=[Tags.Publishers],
+    dependencies=[Depends(oauth2_scheme)]
+)
+async def bulk_import_publishers(
+    *, db: AsyncSession = Depends(get_async_db), request: Request, options: BulkOptions = Depends()
+):
+    return await bulk_import(db, request, PUBLISHERS_IMPORT, options)
+
+
+@publishers_router.get('/export', tags=[Tags.Publishers])
+def export_publishers(
+    *,
+    db: Session = Depends(get_db),
+    name: str | None = Query(None, min_length=3, max_length=20),
+    format: ExportFormat = ExportFormat.ndjson
+):
+    statement = select(Publisher.id, Publisher.name, Publisher.description).order_by(Publisher.id)
+    if name:
+        statement = statement.filter(Publisher.name.ilike('%' + name + '%'))
+
+    return stream_export(db, statement, format, 'publishers')
 
 
 @publishers_router.get(
@@ -40,29 +79,35 @@ def create_publisher(*, db: Session = Depends(get_db), publisher: PublisherCreat
     response_model_exclude_none=True,
     tags=[Tags.Publishers]
 )
-def get_publisher_by_id(*, db: Session = Depends(get_db), publisher_id: int):
-    publisher = db.query(Publisher).filter(Publisher.id == publisher_id).first()
+def get_publisher_by_id(*, db: Session = Depends(get_db), publisher_id: int, fieldset: FieldsetParams = Depends()):
+    publisher = db.query(*fieldset.columns(Publisher, PublisherRead)).filter(Publisher.id == publisher_id).first()
 
     if not publisher:
         raise HTTPException(status_code=404, detail="Publisher not found.")
 
-    return publisher
+    return render_item(PublisherRead, fieldset.expand(db, [publisher], Book.publisher_id)[0])
 
 
 @publishers_router.get(
     '/', 
-    response_model=list[PublisherRead], 
+    response_model=Page[PublisherRead], 
     response_model_exclude_none=True,
     tags=[Tags.Publishers]
 )
 def get_all_publishers(
-    *, db: Session = Depends(get_db), 
+    *, 
+    db: Session = Depends(get_db), 
+    page: PageParams = Depends(),
+    fieldset: FieldsetParams = Depends(),
     name: str | None = Query(None, min_length=3, max_length=20)
 ):
+    base_query = db.query(*fieldset.columns(Publisher, PublisherRead))
     if name:
-        return db.query(Publisher).filter(Publisher.name.ilike('%' + name + '%')).all()
-    
-    return db.query(Publisher).all()
+        base_query = base_query.filter(Publisher.name.ilike('%' + name + '%'))
+
+    result = paginate(base_query, Publisher.id, page)
+    result['items'] = fieldset.expand(db, result['items'], Book.publisher_id)
+    return render_page(PublisherRead, result)
 
 
 @publishers_router.patch(
@@ -73,25 +118,26 @@ def get_all_publishers(
     dependencies=[Depends(oauth2_scheme)]
 )
 def update_publisher(*, db: Session = Depends(get_db), publisher_id: int, publisher: PublisherUpdate):
-    db_publisher = db.get(Publisher, publisher_id)
-    if not publisher:
+    try:
+        db_publisher = update_returning(db, Publisher, publisher_id, publisher.dict(exclude_unset=True))
+        if db_publisher:
+            record_change(db, 'publishers', ChangeOp.updated, db_publisher)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=integrity_error_detail(e, PUBLISHER_CONSTRAINT_ERRORS))
+
+    if not db_publisher:
         raise HTTPException(status_code=404, detail="Publisher not found")
-    
-    publisher_data = publisher.dict(exclude_unset=True)
-    for key, value in publisher_data.items():
-            setattr(db_publisher, key, value)
-    db.add(db_publisher)
-    db.commit()
-    db.refresh(db_publisher)
+
+    response_cache.invalidate('publishers')
+    embed_books(db, [db_publisher], Book.publisher_id, ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT)
     return db_publisher
 
 
 @publishers_router.delete('/{publisher_id}', tags=[Tags.Publishers], dependencies=[Depends(oauth2_scheme)])
 def delete_author(*, db: Session = Depends(get_db), publisher_id: int):
-    publisher = db.get(Publisher, publisher_id)
-    if not publisher:
+    result = delete_with_books(db, Publisher, publisher_id, Book.publisher_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Publisher not found")
-    
-    db.delete(publisher)
-    db.commit()
-    return {'ok': True}
+    return result
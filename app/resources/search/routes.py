@@ -0,0 +1,28 @@
+from fastapi import Depends, APIRouter, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.schemas.schemas import SearchResults
+from app.services.database import get_db
+from app.services.search import SEARCHABLE_MODELS, search
+from app.resources import Tags
+
+
+search_router = APIRouter(prefix='/search')
+
+
+@search_router.get('/', response_model=SearchResults, tags=[Tags.Search])
+def search_catalog(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=3, max_length=100),
+    types: str | None = Query(None, description='Comma-separated subset of books,authors,categories,publishers'),
+    limit: int = Query(20, ge=1, le=100),
+):
+    entity_types = list(SEARCHABLE_MODELS)
+    if types:
+        entity_types = [entity_type.strip() for entity_type in types.split(',') if entity_type.strip()]
+        unknown = set(entity_types) - set(SEARCHABLE_MODELS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}.")
+
+    return {'items': search(db, q, entity_types, limit)}
@@ -1,11 +1,13 @@
 from fastapi import Depends, APIRouter, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.authentication import get_current_active_user, get_password_hash
+from app.auth.authentication import get_current_active_user
+from app.auth.hashing import hashing_pool
 from app.models import User
 from app.resources import Tags
 from app.schemas.schemas import UserCreate, UserRead
-from app.services.database import get_db
+from app.services.database import get_async_db
 
 
 users_router = APIRouter(prefix='/users')
@@ -17,17 +19,16 @@ async def read_users_me(current_user: UserRead = Depends(get_current_active_user
 
 
 @users_router.post('/', tags=[Tags.Users], status_code=status.HTTP_201_CREATED,)
-def create_user(*, db: Session = Depends(get_db), user: UserCreate):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+async def create_user(*, db: AsyncSession = Depends(get_async_db), user: UserCreate):
+    result = await db.execute(select(User).where(User.email == user.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail='Email already exists')
     
     new_user = User(
         email=user.email,
-        hashed_password=get_password_hash(user.password)
+        hashed_password=await hashing_pool.hash(user.password)
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return {'ok': True}
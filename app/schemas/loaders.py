@@ -0,0 +1,37 @@
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app.models import Author, Book, Category, Publisher
+from app.schemas.schemas import BookReadWithAuthor
+
+
+LOADER_OPTIONS = {
+    BookReadWithAuthor: (
+        joinedload(Book.author),
+        joinedload(Book.category),
+        joinedload(Book.publisher),
+    ),
+}
+
+
+def load_for(query, schema):
+    return query.options(*LOADER_OPTIONS.get(schema, ()))
+
+
+def select_book_with_names(books):
+    return (
+        select(
+            books.c.id,
+            books.c.name,
+            books.c.description,
+            books.c.author_id,
+            Author.name.label('author_name'),
+            books.c.category_id,
+            Category.name.label('category_name'),
+            books.c.publisher_id,
+            Publisher.name.label('publisher_name'),
+        )
+        .join(Author, Author.id == books.c.author_id)
+        .join(Category, Category.id == books.c.category_id)
+        .join(Publisher, Publisher.id == books.c.publisher_id)
+    )
@@ -1,5 +1,15 @@
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel, conint
+from pydantic.generics import GenericModel
+
+
+ItemT = TypeVar('ItemT')
+
+
+class Page(GenericModel, Generic[ItemT]):
+    items: list[ItemT]
+    next_cursor: str | None = None
 
 
 class BookBase(BaseModel):
@@ -138,3 +148,80 @@ class UserRead(UserBase):
 
 class UserInDB(UserRead):
     hashed_password: str
+
+
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    name: str
+    rank: float
+
+
+class SearchResults(BaseModel):
+    items: list[SearchHit]
+
+
+class BulkRowError(BaseModel):
+    row: int
+    detail: str | list[dict]
+
+
+class BulkImportReport(BaseModel):
+    mode: str
+    committed: bool
+    received: int
+    inserted: int
+    failed: int
+    errors: list[BulkRowError]
+
+
+class FacetCount(BaseModel):
+    id: int
+    count: int
+
+
+class BookFacets(BaseModel):
+    authors: list[FacetCount]
+    categories: list[FacetCount]
+    publishers: list[FacetCount]
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: dict = {}
+    max_attempts: conint(ge=1) | None = None
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: int | None
+    result: dict | None
+    error: str | None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        orm_mode = True
+
+
+class ChangeRead(BaseModel):
+    id: int
+    entity: str
+    entity_id: int
+    op: str
+    data: dict | None
+    created_at: datetime
+
+
+class ChangeFeed(BaseModel):
+    items: list[ChangeRead]
+    next_cursor: int
+    has_more: bool
+    resync_required: bool
@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, create_model
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+from app.instance.config import ConfigSettings
+
+
+def _is_model(field) -> bool:
+    return isinstance(field.type_, type) and issubclass(field.type_, BaseModel)
+
+
+def _read(obj, name):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(schema: type[BaseModel], exclude_none: bool = True):
+    steps = []
+    for name, field in schema.__fields__.items():
+        convert = None
+        if _is_model(field) and field.shape == SHAPE_SINGLETON:
+            nested = compile_serializer(field.type_, exclude_none)
+            convert = nested
+        elif _is_model(field) and field.shape == SHAPE_LIST:
+            nested = compile_serializer(field.type_, exclude_none)
+            convert = lambda values, nested=nested: [nested(value) for value in values]
+        steps.append((name, convert))
+
+    def serialize(obj) -> dict:
+        data = {}
+        for name, convert in steps:
+            value = _read(obj, name)
+            if value is None:
+                if not exclude_none:
+                    data[name] = None
+                continue
+            data[name] = convert(value) if convert else value
+        return data
+
+    return serialize
+
+
+def render_item(schema: type[BaseModel], item):
+    return ORJSONResponse(compile_serializer(schema)(item))
+
+
+@lru_cache(maxsize=None)
+def sparse_schema(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    definitions = {
+        name: (field.outer_type_, ... if field.required else field.default)
+        for name, field in schema.__fields__.items()
+        if name in fields
+    }
+    return create_model(f'Sparse{schema.__name__}', __config__=schema.__config__, **definitions)
+
+
+def page_content(page: dict, items: list) -> dict:
+    content = {'items': items}
+    if page['next_cursor'] is not None:
+        content['next_cursor'] = page['next_cursor']
+    return content
+
+
+def render_page(schema: type[BaseModel], page: dict):
+    items = page['items']
+    if ConfigSettings.FAST_SERIALIZATION:
+        serialize = compile_serializer(schema)
+        return ORJSONResponse(page_content(page, [serialize(item) for item in items]))
+
+    if not items or not isinstance(items[0], dict):
+        return page
+
+    # Fieldset rows carry only the requested fields; validate them against just those.
+    model = sparse_schema(schema, tuple(items[0]))
+    items = [model.parse_obj(item).dict(exclude_none=True) for item in items]
+    return JSONResponse(jsonable_encoder(page_content(page, items)))
@@ -0,0 +1,274 @@
+import csv
+import json
+from enum import Enum
+from typing import NamedTuple
+
+from fastapi import HTTPException, Query, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.instance.config import ConfigSettings
+from app.models import Author, Book, Category, Publisher
+from app.schemas.schemas import AuthorCreate, BookCreate, CategoryCreate, PublisherCreate
+from app.services.cache import response_cache
+from app.services.changes import ChangeOp, record_changes
+from app.services.database.writes import FOREIGN_KEY_VIOLATION, constraint_name, integrity_error_detail
+from app.services.facets import apply_facet_deltas, facet_deltas
+
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+CSV_CONTENT_TYPES = ('text/csv',)
+
+
+class BulkMode(str, Enum):
+    all_or_nothing = 'all_or_nothing'
+    best_effort = 'best_effort'
+
+
+class BulkSpec(NamedTuple):
+    entity: str
+    model: type
+    schema: type[BaseModel]
+    duplicate_detail: str
+    foreign_keys: dict[str, tuple[type, str]] = {}
+    facets: bool = False
+
+    @property
+    def constraint_errors(self) -> dict[str, str]:
+        errors = {f'ix_{self.entity}_name': self.duplicate_detail}
+        errors.update({f'{self.entity}_{field}_fkey': detail for field, (_, detail) in self.foreign_keys.items()})
+        return errors
+
+
+BOOKS_IMPORT = BulkSpec(
+    entity='books',
+    model=Book,
+    schema=BookCreate,
+    duplicate_detail="Book already exists.",
+    foreign_keys={
+        'author_id': (Author, "Author not found."),
+        'category_id': (Category, "Category not found."),
+        'publisher_id': (Publisher, "Publisher not found."),
+    },
+    facets=True,
+)
+AUTHORS_IMPORT = BulkSpec('authors', Author, AuthorCreate, "Author already exists.")
+CATEGORIES_IMPORT = BulkSpec('categories', Category, CategoryCreate, "Category already exists.")
+PUBLISHERS_IMPORT = BulkSpec('publishers', Publisher, PublisherCreate, "Publisher already exists.")
+
+BULK_SPECS = {spec.entity: spec for spec in (BOOKS_IMPORT, AUTHORS_IMPORT, CATEGORIES_IMPORT, PUBLISHERS_IMPORT)}
+
+
+class BulkOptions:
+    def __init__(
+        self,
+        mode: BulkMode = Query(BulkMode.all_or_nothing),
+        batch_size: int = Query(
+            ConfigSettings.BULK_DEFAULT_BATCH_SIZE, ge=1, le=ConfigSettings.BULK_MAX_BATCH_SIZE
+        ),
+    ):
+        self.mode = mode
+        self.batch_size = batch_size
+
+
+async def iter_lines(request: Request):
+    buffer = b''
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line.decode('utf-8')
+    if buffer:
+        yield buffer.decode('utf-8')
+
+
+async def iter_ndjson(request: Request):
+    async for line in iter_lines(request):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+async def iter_csv(request: Request):
+    header = None
+    pending = ''
+    async for line in iter_lines(request):
+        pending += line + '\n'
+        if pending.count('"') % 2:
+            continue
+
+        values = next(csv.reader(pending.splitlines(keepends=True)), [])
+        pending = ''
+        if not values:
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        yield dict(zip(header, values))
+
+
+def iter_records(request: Request):
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson(request)
+    if content_type in CSV_CONTENT_TYPES:
+        return iter_csv(request)
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Expected an NDJSON or CSV request body.",
+    )
+
+
+class BulkImport:
+    def __init__(self, db: AsyncSession, spec: BulkSpec, options: BulkOptions, on_inserted=None):
+        self.db = db
+        self.spec = spec
+        self.options = options
+        self.on_inserted = on_inserted
+        self.inserted = 0
+        self.errors = []
+
+    def fail(self, row: int, detail):
+        self.errors.append({'row': row, 'detail': detail})
+
+    async def validate(self, batch):
+        spec = self.spec
+        rows = []
+        for row_number, record in batch:
+            if isinstance(record, Exception):
+                self.fail(row_number, "Invalid JSON.")
+                continue
+            try:
+                rows.append((row_number, spec.schema.parse_obj(record).dict()))
+            except ValidationError as e:
+                self.fail(row_number, e.errors())
+
+        if not rows:
+            return []
+
+        names = {values['name'] for _, values in rows}
+        result = await self.db.execute(select(spec.model.name).where(spec.model.name.in_(names)))
+        taken = set(result.scalars())
+
+        existing_ids = {}
+        for field, (parent, _) in spec.foreign_keys.items():
+            ids = {values[field] for _, values in rows}
+            result = await self.db.execute(select(parent.id).where(parent.id.in_(ids)))
+            existing_ids[field] = set(result.scalars())
+
+        valid = []
+        for row_number, values in rows:
+            if values['name'] in taken:
+                self.fail(row_number, spec.duplicate_detail)
+                continue
+
+            missing = [
+                detail for field, (_, detail) in spec.foreign_keys.items()
+                if values[field] not in existing_ids[field]
+            ]
+            if missing:
+                self.fail(row_number, missing[0])
+                continue
+
+            taken.add(values['name'])
+            valid.append((row_number, values))
+
+        return valid
+
+    async def insert(self, valid):
+        if not valid:
+            return
+
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(insert(self.spec.model).values([values for _, values in valid]))
+            await self.inserted_rows([values for _, values in valid])
+            return
+        except IntegrityError:
+            pass
+
+        inserted = []
+        for row_number, values in valid:
+            try:
+                async with self.db.begin_nested():
+                    await self.db.execute(insert(self.spec.model).values(values))
+                inserted.append(values)
+            except IntegrityError as e:
+                self.fail(row_number, await self.integrity_error_detail(e, values))
+        await self.inserted_rows(inserted)
+
+    async def integrity_error_detail(self, exc: IntegrityError, values: dict) -> str:
+        if constraint_name(exc) != FOREIGN_KEY_VIOLATION:
+            return integrity_error_detail(exc, self.spec.constraint_errors)
+
+        for field, (parent, detail) in self.spec.foreign_keys.items():
+            if await self.db.get(parent, values[field]) is None:
+                return detail
+        raise exc
+
+    async def inserted_rows(self, rows):
+        self.inserted += len(rows)
+        if not rows:
+            return
+
+        table = self.spec.model.__table__
+        result = await self.db.execute(select(table).where(table.c.name.in_([values['name'] for values in rows])))
+        inserted = result.all()
+        if self.on_inserted is not None:
+            await self.on_inserted(inserted)
+
+        def record(session):
+            if self.spec.facets:
+                apply_facet_deltas(session, facet_deltas(rows))
+            record_changes(session, self.spec.entity, ChangeOp.created, inserted)
+
+        await self.db.run_sync(record)
+
+    async def process(self, batch):
+        valid = await self.validate(batch)
+        if self.options.mode == BulkMode.all_or_nothing and self.errors:
+            return
+
+        await self.insert(valid)
+        if self.options.mode == BulkMode.best_effort:
+            await self.db.commit()
+
+    async def run(self, records):
+        batch = []
+        row_number = 0
+        async for record in records:
+            row_number += 1
+            batch.append((row_number, record))
+            if len(batch) >= self.options.batch_size:
+                await self.process(batch)
+                batch = []
+        if batch:
+            await self.process(batch)
+
+        committed = self.options.mode == BulkMode.best_effort or not self.errors
+        if committed:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
+            self.inserted = 0
+
+        if self.inserted:
+            response_cache.invalidate(self.spec.entity)
+
+        return {
+            'mode': self.options.mode,
+            'committed': committed,
+            'received': row_number,
+            'inserted': self.inserted,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+async def bulk_import(db: AsyncSession, request: Request, spec: BulkSpec, options: BulkOptions):
+    return await BulkImport(db, spec, options).run(iter_records(request))
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from starlette.requests import HTTPConnection
+
+from app.instance.config import ConfigSettings
+from app.services.database.replicas import reads_from_primary, served_by_replica
+
+
+CACHE_DEPENDENCIES = {
+    '/books': ('books', 'authors', 'categories', 'publishers'),
+    '/authors': ('authors', 'books'),
+    '/categories': ('categories', 'books'),
+    '/publishers': ('publishers', 'books'),
+    '/search': ('books', 'authors', 'categories', 'publishers'),
+}
+
+UNCACHED_SUFFIXES = ('/export',)
+
+VERSIONED_ENTITIES = ('authors', 'books', 'categories', 'publishers')
+VERSION = struct.Struct('<Q')
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    media_type: str
+    body: bytes
+
+    def dumps(self) -> bytes:
+        header = json.dumps({'etag': self.etag, 'media_type': self.media_type}).encode()
+        return header + b'\n' + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> 'CachedResponse':
+        header, body = raw.split(b'\n', 1)
+        return cls(body=body, **json.loads(header))
+
+
+class LocalVersions:
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, names) -> list[int]:
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+    def close(self):
+        pass
+
+
+class SharedVersions:
+    def __init__(self, name: str, entities=VERSIONED_ENTITIES):
+        from multiprocessing import resource_tracker, shared_memory
+
+        self.offsets = {entity: index * VERSION.size for index, entity in enumerate(entities)}
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=VERSION.size * len(entities))
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+        # The counters outlive any single worker; keep the resource tracker from unlinking them.
+        resource_tracker.unregister(self.shm._name, 'shared_memory')
+
+        self.lock_path = os.path.join(tempfile.gettempdir(), f'{name}.lock')
+        self._lock = threading.Lock()
+
+    def get(self, names) -> list[int]:
+        return [VERSION.unpack_from(self.shm.buf, self.offsets[name])[0] for name in names]
+
+    def incr(self, name: str) -> int:
+        import fcntl
+
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                version = VERSION.unpack_from(self.shm.buf, self.offsets[name])[0] + 1
+                VERSION.pack_into(self.shm.buf, self.offsets[name], version)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return version
+
+    def close(self):
+        self.shm.close()
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, versions: LocalVersions | SharedVersions | None = None):
+        self.maxsize = maxsize
+        self.versions = versions if versions is not None else LocalVersions()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_versions(self, names) -> list[int]:
+        return self.versions.get(names)
+
+    def incr(self, name: str) -> int:
+        return self.versions.incr(name)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        self.versions.close()
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('RESPONSE_CACHE_BACKEND=redis requires the redis package.') from e
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(f'response:{key}')
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._client.set(f'response:{key}', value, px=int(ttl * 1000))
+
+    def get_versions(self, names) -> list[int]:
+        return [int(value or 0) for value in self._client.mget([f'version:{name}' for name in names])]
+
+    def incr(self, name: str) -> int:
+        return self._client.incr(f'version:{name}')
+
+    def clear(self):
+        for key in self._client.scan_iter('response:*'):
+            self._client.delete(key)
+
+    def close(self):
+        self._client.close()
+
+
+def create_backend():
+    if ConfigSettings.RESPONSE_CACHE_BACKEND == 'redis':
+        return RedisBackend(ConfigSettings.RESPONSE_CACHE_URL)
+
+    versions = None
+    if ConfigSettings.WEB_CONCURRENCY > 1:
+        versions = SharedVersions(ConfigSettings.RESPONSE_CACHE_SHM_NAME)
+    return MemoryBackend(ConfigSettings.RESPONSE_CACHE_MAXSIZE, versions)
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    def dependencies_for(self, path: str):
+        if path.endswith(UNCACHED_SUFFIXES):
+            return None
+
+        for prefix, entities in CACHE_DEPENDENCIES.items():
+            if path == prefix or path.startswith(prefix + '/'):
+                return entities
+        return None
+
+    def build_key(self, path: str, query_string: bytes, entities) -> str:
+        versions = self.backend.get_versions(entities)
+        stamp = ','.join(f'{name}={version}' for name, version in zip(entities, versions))
+        return f'{path}?{query_string.decode("latin-1")}|{stamp}'
+
+    def get(self, key: str) -> CachedResponse | None:
+        raw = self.backend.get(key)
+        return CachedResponse.loads(raw) if raw is not None else None
+
+    def set(self, key: str, response: CachedResponse, ttl: float | None = None):
+        self.backend.set(key, response.dumps(), self.ttl if ttl is None else min(ttl, self.ttl))
+
+    def invalidate(self, *entities: str):
+        for entity in entities:
+            self.backend.incr(entity)
+
+    def close(self):
+        self.backend.close()
+
+
+response_cache = ResponseCache(create_backend(), ConfigSettings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET' or not ConfigSettings.RESPONSE_CACHE_ENABLED:
+            return await self.app(scope, receive, send)
+
+        entities = self.cache.dependencies_for(scope['path'])
+        if entities is None or reads_from_primary(HTTPConnection(scope)):
+            return await self.app(scope, receive, send)
+
+        key = self.cache.build_key(scope['path'], scope['query_string'], entities)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return await self._send_cached(scope, send, cached, 'HIT')
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            cached = await asyncio.shield(inflight)
+            if cached is not None:
+                return await self._send_cached(scope, send, cached, 'HIT')
+            return await self.app(scope, receive, send)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        cached = None
+        try:
+            start, body = await self._capture(scope, receive)
+            if start['status'] == 200:
+                headers = dict(start['headers'])
+                media_type = headers.get(b'content-type', b'application/json').decode('latin-1')
+                cached = CachedResponse(make_etag(body), media_type, body)
+                # A lagging replica can serve pre-write rows under the post-write version key; keep
+                # those entries no longer than the replica is allowed to lag.
+                ttl = ConfigSettings.READ_YOUR_WRITES_SECONDS if served_by_replica(scope) else None
+                self.cache.set(key, cached, ttl)
+        finally:
+            del self._inflight[key]
+            future.set_result(cached)
+
+        if cached is not None:
+            return await self._send_cached(scope, send, cached, 'MISS')
+
+        await send(start)
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _capture(self, scope, receive):
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.app(scope, receive, capture)
+        return start, b''.join(chunks)
+
+    async def _send_cached(self, scope, send, cached: CachedResponse, status: str):
+        headers = [
+            (b'etag', cached.etag.encode()),
+            (b'x-cache', status.encode()),
+        ]
+        if_none_match = dict(scope['headers']).get(b'if-none-match')
+        if if_none_match is not None and etag_matches(if_none_match.decode('latin-1'), cached.etag):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        headers += [
+            (b'content-type', cached.media_type.encode()),
+            (b'content-length', str(len(cached.body)).encode()),
+        ]
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': cached.body})
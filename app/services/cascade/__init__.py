@@ -0,0 +1,77 @@
+import time
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+from app.models import Author, Book, Category, Publisher
+from app.services.cache import response_cache
+from app.services.changes import ChangeOp, record_change, record_changes
+from app.services.database.writes import supports_returning
+from app.services.facets import apply_facet_deltas, facet_deltas
+
+
+CASCADE_PARENTS = {
+    'authors': (Author, Book.author_id),
+    'categories': (Category, Book.category_id),
+    'publishers': (Publisher, Book.publisher_id),
+}
+
+
+def delete_children_chunk(db: Session, foreign_key, parent_id: int, chunk_size: int) -> int:
+    books = Book.__table__
+    returned_columns = (books.c.id, books.c.author_id, books.c.category_id, books.c.publisher_id)
+    chunk = select(books.c.id).where(foreign_key == parent_id).order_by(books.c.id).limit(chunk_size)
+
+    if supports_returning(db):
+        rows = db.execute(
+            delete(books).where(books.c.id.in_(chunk.scalar_subquery())).returning(*returned_columns)
+        ).all()
+    else:
+        rows = db.execute(select(*returned_columns).where(books.c.id.in_(chunk.scalar_subquery()))).all()
+        if rows:
+            db.execute(delete(books).where(books.c.id.in_([row.id for row in rows])))
+
+    apply_facet_deltas(db, facet_deltas(rows, sign=-1))
+    record_changes(db, 'books', ChangeOp.deleted, rows)
+    return len(rows)
+
+
+def delete_with_books(
+    db: Session,
+    model,
+    parent_id: int,
+    foreign_key,
+    chunk_size: int | None = None,
+    on_progress=None,
+) -> dict | None:
+    if db.get(model, parent_id) is None:
+        return None
+
+    chunk_size = chunk_size or ConfigSettings.CASCADE_DELETE_CHUNK_SIZE
+
+    entity = model.__tablename__
+    deleted_books = 0
+    while True:
+        deleted = delete_children_chunk(db, foreign_key, parent_id, chunk_size)
+        if deleted < chunk_size:
+            break
+
+        db.commit()
+        deleted_books += deleted
+        response_cache.invalidate('books')
+        if on_progress is not None:
+            on_progress(deleted_books)
+        if ConfigSettings.CASCADE_DELETE_PAUSE_MS:
+            time.sleep(ConfigSettings.CASCADE_DELETE_PAUSE_MS / 1000)
+
+    db.execute(select(model.id).where(model.id == parent_id).with_for_update())
+    while deleted:
+        deleted_books += deleted
+        deleted = delete_children_chunk(db, foreign_key, parent_id, chunk_size)
+
+    result = db.execute(delete(model.__table__).where(model.__table__.c.id == parent_id))
+    record_change(db, entity, ChangeOp.deleted, {'id': parent_id})
+    db.commit()
+    response_cache.invalidate(entity, 'books')
+    return {'ok': True, 'deleted': {entity: result.rowcount, 'books': deleted_books}}
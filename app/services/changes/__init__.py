@@ -0,0 +1,144 @@
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from enum import Enum
+
+from sqlalchemy import delete, event, exists, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+from app.models import Author, Book, Category, Change, ChangeCompaction, ChangeSequence, Publisher
+from app.services.database import Base
+from app.services.database.writes import supports_returning
+
+
+CHANGE_ENTITIES = {
+    'authors': Author,
+    'books': Book,
+    'categories': Category,
+    'publishers': Publisher,
+}
+
+
+class ChangeOp(str, Enum):
+    created = 'created'
+    updated = 'updated'
+    deleted = 'deleted'
+
+
+def row_values(row) -> dict:
+    if isinstance(row, Mapping):
+        return row
+    if hasattr(row, '_mapping'):
+        return dict(row._mapping)
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns}
+
+
+def record_changes(db: Session, entity: str, op: ChangeOp, rows):
+    columns = CHANGE_ENTITIES[entity].__table__.c.keys()
+    now = datetime.utcnow()
+    # Pending changes are discarded when the transaction ends, so make sure one has begun.
+    db.connection()
+    pending = db.info.setdefault('pending_changes', [])
+    for row in rows:
+        row = row_values(row)
+        data = None if op == ChangeOp.deleted else {column: row[column] for column in columns if column in row}
+        pending.append({'entity': entity, 'entity_id': row['id'], 'op': op.value, 'data': data, 'created_at': now})
+
+
+def record_change(db: Session, entity: str, op: ChangeOp, row):
+    record_changes(db, entity, op, [row])
+
+
+def allocate_change_ids(db: Session, count: int) -> int:
+    sequence = ChangeSequence.__table__
+    statement = update(sequence).where(sequence.c.id == 1).values(value=sequence.c.value + count)
+    if supports_returning(db):
+        return db.execute(statement.returning(sequence.c.value)).scalar_one()
+
+    db.execute(statement)
+    return db.execute(select(sequence.c.value).where(sequence.c.id == 1)).scalar_one()
+
+
+# Change ids are taken from the sequence row just before commit. The row stays locked until the
+# transaction commits, so ids are handed out in commit order and a cursor never skips a change
+# whose transaction started earlier but committed later.
+@event.listens_for(Session, 'before_commit')
+def write_pending_changes(session):
+    values = session.info.pop('pending_changes', None)
+    if not values:
+        return
+
+    last = allocate_change_ids(session, len(values))
+    for id, value in enumerate(values, last - len(values) + 1):
+        value['id'] = id
+    session.execute(insert(Change.__table__), values)
+    session.info['committed_changes'] = values
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def discard_pending_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('pending_changes', None)
+        session.info.pop('committed_changes', None)
+
+
+def seed_change_sequence(connection: Connection):
+    sequence = ChangeSequence.__table__
+    if connection.execute(select(sequence.c.id).where(sequence.c.id == 1)).first() is None:
+        head = connection.execute(select(func.max(Change.id))).scalar() or 0
+        connection.execute(insert(sequence).values(id=1, value=head))
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def create_change_sequence(target, connection, tables=(), **kw):
+    if ChangeSequence.__table__ in tables:
+        seed_change_sequence(connection)
+
+
+def compacted_through(db: Session) -> int:
+    return db.execute(select(func.max(ChangeCompaction.compacted_through))).scalar() or 0
+
+
+def changes_since(db: Session, since: int, limit: int) -> dict:
+    watermark = compacted_through(db)
+    head = max(db.execute(select(func.max(Change.id))).scalar() or 0, watermark)
+    if since < watermark or since > head:
+        return {'items': [], 'next_cursor': head, 'has_more': False, 'resync_required': True}
+
+    rows = db.execute(
+        select(Change.id, Change.entity, Change.entity_id, Change.op, Change.data, Change.created_at)
+        .where(Change.id > since)
+        .order_by(Change.id)
+        .limit(limit + 1)
+    ).all()
+
+    items = [dict(row._mapping) for row in rows[:limit]]
+    return {
+        'items': items,
+        'next_cursor': items[-1]['id'] if items else since,
+        'has_more': len(rows) > limit,
+        'resync_required': False,
+    }
+
+
+def compact_changes(db: Session, retention_seconds: int = ConfigSettings.CHANGES_RETENTION_SECONDS) -> dict:
+    changes = Change.__table__
+    later = changes.alias('later')
+    collapsed = db.execute(delete(changes).where(exists().where(
+        later.c.entity == changes.c.entity,
+        later.c.entity_id == changes.c.entity_id,
+        later.c.id > changes.c.id,
+    ))).rowcount
+
+    cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+    expired_through = db.execute(select(func.max(changes.c.id)).where(changes.c.created_at < cutoff)).scalar()
+    expired = 0
+    if expired_through is not None:
+        expired = db.execute(delete(changes).where(changes.c.id <= expired_through)).rowcount
+        db.execute(insert(ChangeCompaction.__table__).values(
+            compacted_through=expired_through, compacted_at=datetime.utcnow()
+        ))
+
+    db.commit()
+    return {'collapsed': collapsed, 'expired': expired, 'compacted_through': compacted_through(db)}
@@ -1,27 +1,104 @@
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from starlette.requests import Request
 
 from app.instance.config import ConfigSettings
+from app.services.database.pool import engine_options
+from app.services.database.replicas import ReplicaSet, reads_from_primary
 
 LOCAL_DATABASE_URL = ConfigSettings.DATABASE_URL
 DATABASE_URL = os.environ.get('DATABASE_URL', LOCAL_DATABASE_URL)
+DATABASE_REPLICA_URLS = [url.strip() for url in ConfigSettings.DATABASE_REPLICA_URLS.split(',') if url.strip()]
 
-engine = create_engine(DATABASE_URL)
+ASYNC_DRIVERS = {
+    'postgres': 'postgresql+asyncpg',
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def make_async_url(url: str):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def configure_sqlite(engine):
+    # pysqlite and aiosqlite manage transactions themselves, which breaks SAVEPOINT;
+    # hand transaction control back to SQLAlchemy and enforce foreign keys like Postgres.
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+def make_engine(url: str):
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == 'sqlite':
+        configure_sqlite(engine)
+    return engine
+
+
+def make_async_engine(url: str, **options):
+    engine = create_async_engine(make_async_url(url), **options)
+    if engine.dialect.name == 'sqlite':
+        configure_sqlite(engine.sync_engine)
+    return engine
+
+
+engine = make_engine(DATABASE_URL)
+async_engine = make_async_engine(DATABASE_URL, **engine_options(DATABASE_URL, is_async=True))
+
+replica_set = ReplicaSet(
+    [make_engine(url) for url in DATABASE_REPLICA_URLS],
+    check_interval=ConfigSettings.REPLICA_HEALTH_CHECK_INTERVAL,
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=async_engine, class_=AsyncSession
+)
 
 Base = declarative_base()
 
 
-def get_db() -> Session:
-    db: Session = SessionLocal()
+def session_factory_for(request: Request):
+    if replica_set.replicas and not reads_from_primary(request):
+        replica = replica_set.choose()
+        if replica is not None:
+            request.state.read_replica = True
+            return replica.session_factory
+    return SessionLocal
+
+
+def get_db(request: Request) -> Session:
+    db: Session = session_factory_for(request)()
     try:
         yield db
     finally:
         db.close()
 
-def create_db_and_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def create_db_and_tables() -> bool:
+    if not ConfigSettings.SCHEMA_VERSION_CHECK:
+        Base.metadata.create_all(bind=engine)
+        return True
+
+    from app.services.database.schema import ensure_schema
+
+    return ensure_schema(engine, Base.metadata)
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.instance.config import ConfigSettings
+
+
+class PoolStatsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'size': self.size(),
+                'checked_in': self.checkedin(),
+                'checked_out': self.checkedout(),
+                'overflow': self.overflow(),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_time_total_ms': round(self.wait_time_total * 1000, 3),
+                'wait_time_max_ms': round(self.wait_time_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_limits(share: float) -> tuple[int, int]:
+    if not ConfigSettings.DB_CONNECTION_BUDGET:
+        return ConfigSettings.DB_POOL_SIZE, ConfigSettings.DB_MAX_OVERFLOW
+
+    per_worker = ConfigSettings.DB_CONNECTION_BUDGET // max(1, ConfigSettings.WEB_CONCURRENCY)
+    connections = max(1, int(per_worker * share))
+    pool_size = max(1, connections * 2 // 3)
+    return pool_size, connections - pool_size
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+
+    share = ConfigSettings.DB_ASYNC_POOL_SHARE if is_async else 1 - ConfigSettings.DB_ASYNC_POOL_SHARE
+    pool_size, max_overflow = pool_limits(share)
+    options = {
+        'poolclass': InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_recycle': ConfigSettings.DB_POOL_RECYCLE,
+        'pool_pre_ping': ConfigSettings.DB_POOL_PRE_PING,
+        'pool_timeout': ConfigSettings.DB_POOL_TIMEOUT,
+    }
+
+    if ConfigSettings.DB_STATEMENT_TIMEOUT_MS and backend == 'postgresql':
+        timeout = str(ConfigSettings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options['connect_args'] = {'server_settings': {'statement_timeout': timeout}}
+        else:
+            options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+
+    return options
+
+
+def warm_count(engine, connections: int) -> int:
+    if not isinstance(engine.pool, QueuePool):
+        return 0
+    return min(connections, engine.pool.size())
+
+
+def warm_pool(engine, connections: int):
+    opened = []
+    try:
+        for _ in range(warm_count(engine, connections)):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_async_pool(engine, connections: int):
+    opened = []
+    try:
+        for _ in range(warm_count(engine.sync_engine, connections)):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, PoolStatsMixin):
+        return pool.stats()
+    return {'status': pool.status()}
@@ -0,0 +1,95 @@
+import itertools
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import HTTPConnection
+
+from app.instance.config import ConfigSettings
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_UNTIL_HEADER = 'X-Primary-Until'
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.healthy = True
+        self.checked_at = float('-inf')
+
+    def check(self):
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+
+
+class ReplicaSet:
+    def __init__(self, engines, check_interval: float):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def is_healthy(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            due = now - replica.checked_at >= self.check_interval
+            if due:
+                replica.checked_at = now
+        if due:
+            replica.check()
+        return replica.healthy
+
+    def choose(self) -> Replica | None:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if self.is_healthy(replica):
+                return replica
+        return None
+
+
+def primary_pinned_until(connection: HTTPConnection) -> float:
+    value = connection.headers.get(PRIMARY_UNTIL_HEADER) or connection.cookies.get(ConfigSettings.READ_YOUR_WRITES_COOKIE)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def served_by_replica(scope) -> bool:
+    return scope.get('state', {}).get('read_replica', False)
+
+
+def reads_from_primary(connection: HTTPConnection) -> bool:
+    return connection.scope['method'] not in SAFE_METHODS or time.time() < primary_pinned_until(connection)
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def pin_to_primary(message):
+            if message['type'] == 'http.response.start' and message['status'] < 400:
+                until = f'{time.time() + ConfigSettings.READ_YOUR_WRITES_SECONDS:.3f}'
+                cookie = (
+                    f'{ConfigSettings.READ_YOUR_WRITES_COOKIE}={until}; '
+                    f'Max-Age={ConfigSettings.READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax'
+                )
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'set-cookie', cookie.encode()),
+                    (PRIMARY_UNTIL_HEADER.lower().encode(), until.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, pin_to_primary)
@@ -0,0 +1,82 @@
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+SCHEMA_LOCK_ID = 72_410_019
+
+schema_metadata = MetaData()
+
+schema_version = Table(
+    'schema_version',
+    schema_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('fingerprint', String, nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def schema_fingerprint(metadata, dialect, migrations=()) -> str:
+    digest = hashlib.sha256()
+    # Migrations can change data or constraints the models do not describe, so a new one must
+    # change the fingerprint even when the DDL stays the same.
+    for migration in migrations:
+        digest.update(f'{migration.version}:{migration.name}'.encode())
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()[:32]
+
+
+def stored_fingerprint(engine) -> str | None:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(schema_version.c.fingerprint).where(schema_version.c.id == 1)).scalar()
+    except DBAPIError:
+        return None
+
+
+@contextmanager
+def schema_lock(engine):
+    if engine.dialect.name != 'postgresql':
+        yield
+        return
+
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        connection.exec_driver_sql(f'SELECT pg_advisory_lock({SCHEMA_LOCK_ID})')
+        try:
+            yield
+        finally:
+            connection.exec_driver_sql(f'SELECT pg_advisory_unlock({SCHEMA_LOCK_ID})')
+
+
+def store_fingerprint(engine, fingerprint: str):
+    values = {'fingerprint': fingerprint, 'applied_at': datetime.utcnow()}
+    with engine.begin() as connection:
+        schema_metadata.create_all(bind=connection)
+        updated = connection.execute(schema_version.update().where(schema_version.c.id == 1).values(**values))
+        if not updated.rowcount:
+            connection.execute(schema_version.insert().values(id=1, **values))
+
+
+def ensure_schema(engine, metadata) -> bool:
+    from app.migrations import load_migrations, migrate
+
+    fingerprint = schema_fingerprint(metadata, engine.dialect, load_migrations())
+    if stored_fingerprint(engine) == fingerprint:
+        return False
+
+    with schema_lock(engine):
+        if stored_fingerprint(engine) == fingerprint:
+            return False
+
+        migrate(engine)
+        metadata.create_all(bind=engine)
+        store_fingerprint(engine, fingerprint)
+    return True
@@ -0,0 +1,68 @@
+import re
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+FOREIGN_KEY_VIOLATION = 'FOREIGN KEY'
+
+SQLITE_UNIQUE_MESSAGE = re.compile(r'UNIQUE constraint failed: (\w+)\.(\w+)')
+
+
+def supports_returning(db: Session) -> bool:
+    return db.get_bind().dialect.full_returning
+
+
+def constraint_name(exc: IntegrityError) -> str | None:
+    diag = getattr(exc.orig, 'diag', None)
+    if getattr(diag, 'constraint_name', None):
+        return diag.constraint_name
+
+    cause = getattr(exc.orig, '__cause__', None)
+    if getattr(cause, 'constraint_name', None):
+        return cause.constraint_name
+
+    message = str(exc.orig)
+    match = SQLITE_UNIQUE_MESSAGE.search(message)
+    if match:
+        return f'ix_{match.group(1)}_{match.group(2)}'
+    if 'FOREIGN KEY constraint failed' in message:
+        return FOREIGN_KEY_VIOLATION
+
+    return None
+
+
+def insert_returning(db: Session, model, values: dict) -> dict:
+    table = model.__table__
+    if supports_returning(db):
+        row = db.execute(insert(table).values(**values).returning(*table.c)).one()
+        return dict(row._mapping)
+
+    result = db.execute(insert(table).values(**values))
+    row = dict.fromkeys(table.c.keys())
+    row.update(values, **dict(zip(table.primary_key.columns.keys(), result.inserted_primary_key)))
+    return row
+
+
+def update_returning(db: Session, model, id: int, values: dict) -> dict | None:
+    table = model.__table__
+    if not values:
+        row = db.execute(select(table).where(table.c.id == id)).first()
+        return dict(row._mapping) if row else None
+
+    statement = update(table).where(table.c.id == id).values(**values)
+    if supports_returning(db):
+        row = db.execute(statement.returning(*table.c)).first()
+        return dict(row._mapping) if row else None
+
+    if not db.execute(statement).rowcount:
+        return None
+    return dict(db.execute(select(table).where(table.c.id == id)).one()._mapping)
+
+
+def integrity_error_detail(exc: IntegrityError, messages: dict[str, str]) -> str:
+    detail = messages.get(constraint_name(exc))
+    if detail is None:
+        raise exc
+    return detail
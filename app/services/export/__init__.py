@@ -0,0 +1,59 @@
+import csv
+import io
+from enum import Enum
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+def iter_partitions(db: Session, statement):
+    # ORM sessions only fetch in batches when yield_per is set; stream_results alone still calls fetchall()
+    # on drivers without server-side cursors such as pysqlite.
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=ConfigSettings.EXPORT_BATCH_SIZE))
+    try:
+        yield from result.partitions(ConfigSettings.EXPORT_BATCH_SIZE)
+    finally:
+        result.close()
+
+
+def iter_ndjson(db: Session, statement):
+    for rows in iter_partitions(db, statement):
+        yield b''.join(orjson.dumps(dict(row._mapping)) + b'\n' for row in rows)
+
+
+def iter_csv(db: Session, statement):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in statement.selected_columns])
+
+    for rows in iter_partitions(db, statement):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(db: Session, statement, format: ExportFormat, filename: str):
+    chunks = iter_csv(db, statement) if format == ExportFormat.csv else iter_ndjson(db, statement)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{format.value}"'},
+    )
@@ -0,0 +1,118 @@
+from collections import Counter
+
+from sqlalchemy import delete, event, func, insert, literal, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import Book, BookFacetCount
+from app.services.database import Base
+
+
+FACETS = {
+    'authors': Book.author_id,
+    'categories': Book.category_id,
+    'publishers': Book.publisher_id,
+}
+
+FACET_COLUMNS = tuple(column.key for column in FACETS.values())
+
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def facet_deltas(rows, sign: int = 1) -> Counter:
+    deltas = Counter()
+    for row in rows:
+        for column in FACET_COLUMNS:
+            value = row.get(column) if isinstance(row, dict) else getattr(row, column)
+            if value is not None:
+                deltas[(column, value)] += sign
+    return deltas
+
+
+def changed_facet_deltas(old, new: dict) -> Counter:
+    changed = {column: new[column] for column in FACET_COLUMNS if column in new}
+    if not changed:
+        return Counter()
+    deltas = facet_deltas([changed])
+    deltas.subtract(facet_deltas([{column: getattr(old, column) for column in changed}]))
+    return deltas
+
+
+def apply_facet_deltas(db: Session, deltas: Counter):
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    table = BookFacetCount.__table__
+    values = [{'facet': facet, 'value_id': value_id, 'count': delta} for (facet, value_id), delta in deltas.items()]
+    upsert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        statement = upsert(table).values(values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.facet, table.c.value_id],
+            set_={'count': table.c.count + statement.excluded.count},
+        ))
+    else:
+        for row in values:
+            result = db.execute(
+                update(table)
+                .where(table.c.facet == row['facet'], table.c.value_id == row['value_id'])
+                .values(count=table.c.count + row['count'])
+            )
+            if not result.rowcount:
+                db.execute(insert(table).values(row))
+
+    if any(delta < 0 for delta in deltas.values()):
+        db.execute(delete(table).where(table.c.count <= 0))
+
+
+def rebuild_facet_counts(db: Session | Connection):
+    table = BookFacetCount.__table__
+    db.execute(delete(table))
+    for column in FACET_COLUMNS:
+        book_column = Book.__table__.c[column]
+        db.execute(insert(table).from_select(
+            ['facet', 'value_id', 'count'],
+            select(literal(column), book_column, func.count())
+            .where(book_column.isnot(None))
+            .group_by(book_column),
+        ))
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def backfill_facet_counts(target, connection, tables=(), **kw):
+    if BookFacetCount.__table__ in tables:
+        rebuild_facet_counts(connection)
+
+
+def stored_facet_counts(db: Session) -> dict[str, list[dict]]:
+    facet_names = {column.key: name for name, column in FACETS.items()}
+    result = {name: [] for name in FACETS}
+    rows = db.execute(
+        select(BookFacetCount.facet, BookFacetCount.value_id, BookFacetCount.count)
+        .where(BookFacetCount.count > 0)
+        .order_by(BookFacetCount.facet, BookFacetCount.count.desc(), BookFacetCount.value_id)
+    )
+    for facet, value_id, count in rows:
+        result[facet_names[facet]].append({'id': value_id, 'count': count})
+    return result
+
+
+def filtered_facet_counts(db: Session, filters) -> dict[str, list[dict]]:
+    selects = [
+        filters.apply(
+            select(literal(name).label('facet'), column.label('value_id'), func.count().label('count'))
+            .where(column.isnot(None))
+            .group_by(column)
+        )
+        for name, column in FACETS.items()
+    ]
+    result = {name: [] for name in FACETS}
+    rows = db.execute(union_all(*selects))
+    for facet, value_id, count in sorted(rows, key=lambda row: (row.facet, -row.count, row.value_id)):
+        result[facet].append({'id': value_id, 'count': count})
+    return result
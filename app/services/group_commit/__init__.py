@@ -0,0 +1,104 @@
+import asyncio
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.instance.config import ConfigSettings
+from app.models import Book
+from app.schemas.loaders import select_book_with_names
+from app.services.bulk import AUTHORS_IMPORT, BOOKS_IMPORT, BulkImport, BulkMode, BulkOptions, BulkSpec
+from app.services.cache import response_cache
+from app.services.database import AsyncSessionLocal
+
+
+# Batches from every committer go out one at a time so they never contend for write locks;
+# requests arriving while a batch commits are picked up by the next one.
+commit_lock = asyncio.Lock()
+
+
+async def inserted_rows(db: AsyncSession, inserted) -> list[dict]:
+    return [dict(row._mapping) for row in inserted]
+
+
+async def books_with_names(db: AsyncSession, inserted) -> list[dict]:
+    books = Book.__table__
+    result = await db.execute(select_book_with_names(books).where(books.c.id.in_([row.id for row in inserted])))
+    return [dict(row._mapping) for row in result]
+
+
+class GroupCommitter:
+    def __init__(self, spec: BulkSpec, window_ms: float, max_batch: int, load_rows=inserted_rows):
+        self.spec = spec
+        self.load_rows = load_rows
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, values: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((values, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None and self._task is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.drain())
+
+    async def drain(self):
+        try:
+            while self.pending:
+                async with commit_lock:
+                    batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+                    await self.commit(batch)
+        finally:
+            self._task = None
+
+    async def commit(self, batch: list[tuple[dict, asyncio.Future]]):
+        options = BulkOptions(mode=BulkMode.best_effort, batch_size=len(batch))
+        rows = {}
+        try:
+            async with AsyncSessionLocal() as db:
+                # Response rows are read inside the batch transaction, so they match what commits.
+                async def collect(inserted):
+                    rows.update((row['name'], row) for row in await self.load_rows(db, inserted))
+
+                bulk = BulkImport(db, self.spec, options, on_inserted=collect)
+                await bulk.insert(await bulk.validate([(index, values) for index, (values, _) in enumerate(batch)]))
+                await db.commit()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if bulk.inserted:
+            response_cache.invalidate(self.spec.entity)
+
+        errors = {error['row']: error['detail'] for error in bulk.errors}
+        for index, (values, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(HTTPException(status_code=400, detail=errors[index]))
+            else:
+                future.set_result(rows[values['name']])
+
+
+book_commits = GroupCommitter(
+    BOOKS_IMPORT,
+    window_ms=ConfigSettings.GROUP_COMMIT_WINDOW_MS,
+    max_batch=ConfigSettings.GROUP_COMMIT_MAX_BATCH,
+    load_rows=books_with_names,
+)
+author_commits = GroupCommitter(
+    AUTHORS_IMPORT, window_ms=ConfigSettings.GROUP_COMMIT_WINDOW_MS, max_batch=ConfigSettings.GROUP_COMMIT_MAX_BATCH
+)
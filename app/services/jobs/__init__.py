@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import NamedTuple
+
+from pydantic import BaseModel
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+from app.models import Job
+from app.services.database import SessionLocal
+from app.services.metrics import registry
+
+
+logger = logging.getLogger('app.jobs')
+
+
+class JobStatus(str, Enum):
+    queued = 'queued'
+    running = 'running'
+    succeeded = 'succeeded'
+    failed = 'failed'
+    cancelled = 'cancelled'
+
+
+ACTIVE_STATUSES = (JobStatus.queued, JobStatus.running)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobInterrupted(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    pass
+
+
+class JobKind(NamedTuple):
+    params: type[BaseModel]
+    handler: callable
+
+
+class JobContext:
+    def __init__(self, runner: 'JobRunner', job_id: int):
+        self.runner = runner
+        self.job_id = job_id
+
+    @property
+    def app(self):
+        return self.runner.app
+
+    def progress(self, done: int, total: int | None = None):
+        values = {'progress': done, 'heartbeat_at': datetime.utcnow()}
+        if total is not None:
+            values['total'] = total
+
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == self.job_id).values(**values))
+            cancel_requested = db.execute(select(Job.cancel_requested).where(Job.id == self.job_id)).scalar()
+            db.commit()
+
+        if cancel_requested:
+            raise JobCancelled()
+        if self.runner.stopping.is_set():
+            raise JobInterrupted()
+        self.throttle()
+
+    def throttle(self):
+        time.sleep(ConfigSettings.JOB_THROTTLE_MS / 1000)
+        if not ConfigSettings.JOB_YIELD_IN_FLIGHT:
+            return
+
+        deadline = time.monotonic() + ConfigSettings.JOB_YIELD_MAX_SECONDS
+        while (
+            registry.gauge_total('http_requests_in_progress') > ConfigSettings.JOB_YIELD_IN_FLIGHT
+            and time.monotonic() < deadline
+            and not self.runner.stopping.is_set()
+        ):
+            time.sleep(0.05)
+
+    def run_async(self, coroutine, timeout: float | None = None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.runner.loop).result(timeout)
+
+
+def runnable_jobs(now: datetime):
+    stale_before = now - timedelta(seconds=ConfigSettings.JOB_STALE_SECONDS)
+    return or_(
+        and_(Job.status == JobStatus.queued, Job.run_after <= now),
+        and_(Job.status == JobStatus.running, Job.heartbeat_at < stale_before),
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=ConfigSettings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+class JobRunner:
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.kinds: dict[str, JobKind] = {}
+        self.app = None
+        self.loop = None
+        self.stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self, app, kinds: dict[str, JobKind]):
+        self.app = app
+        self.kinds = kinds
+        self.loop = asyncio.get_running_loop()
+        self.stopping.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self.work, name=f'job-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout: float):
+        self.stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def work(self):
+        while not self.stopping.is_set():
+            try:
+                job_id = self.claim()
+            except Exception:
+                logger.exception('Could not claim a job')
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self.run(job_id)
+
+    def claim(self) -> int | None:
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            job_id = db.execute(
+                select(Job.id)
+                .where(runnable_jobs(now))
+                .order_by(Job.run_after, Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if job_id is None:
+                return None
+
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, runnable_jobs(now))
+                .values(status=JobStatus.running, attempts=Job.attempts + 1, heartbeat_at=now, started_at=now)
+            ).rowcount
+            db.commit()
+        return job_id if claimed else None
+
+    def heartbeat(self, job_id: int, done: threading.Event):
+        while not done.wait(ConfigSettings.JOB_HEARTBEAT_SECONDS):
+            try:
+                with SessionLocal() as db:
+                    db.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.utcnow()))
+                    db.commit()
+            except Exception:
+                logger.exception('Could not record a heartbeat for job %s', job_id)
+
+    @contextmanager
+    def beating(self, job_id: int):
+        done = threading.Event()
+        thread = threading.Thread(
+            target=self.heartbeat, args=(job_id, done), name=f'job-heartbeat-{job_id}', daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def finish(self, job_id: int, status: JobStatus, **values):
+        if status not in ACTIVE_STATUSES:
+            values['finished_at'] = datetime.utcnow()
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == job_id).values(status=status, **values))
+            db.commit()
+
+    def run(self, job_id: int):
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            kind, params, attempts, max_attempts = job.kind, job.params, job.attempts, job.max_attempts
+
+        try:
+            if attempts > max_attempts:
+                raise JobFailed('Worker stopped while running the job.')
+            if kind not in self.kinds:
+                raise JobFailed(f'Unknown job kind: {kind}.')
+
+            spec = self.kinds[kind]
+            # Handlers report progress between chunks, but a single statement (a REINDEX, the facet
+            # rebuild) can outlast JOB_STALE_SECONDS; keep the claim alive while the handler runs.
+            with self.beating(job_id):
+                result = spec.handler(JobContext(self, job_id), spec.params.parse_obj(params))
+        except JobCancelled:
+            self.finish(job_id, JobStatus.cancelled)
+        except JobInterrupted:
+            self.finish(job_id, JobStatus.queued, attempts=Job.attempts - 1, run_after=datetime.utcnow())
+        except JobFailed as e:
+            self.finish(job_id, JobStatus.failed, error=str(e))
+        except Exception as e:
+            logger.exception('Job %s (%s) failed on attempt %s of %s', job_id, kind, attempts, max_attempts)
+            if attempts < max_attempts:
+                self.finish(
+                    job_id, JobStatus.queued, error=str(e), run_after=datetime.utcnow() + retry_delay(attempts)
+                )
+            else:
+                self.finish(job_id, JobStatus.failed, error=str(e))
+        else:
+            self.finish(job_id, JobStatus.succeeded, result=result, error=None)
+
+
+job_runner = JobRunner(workers=ConfigSettings.JOB_WORKERS, poll_interval=ConfigSettings.JOB_POLL_INTERVAL)
+
+
+def active_job_count(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(Job).where(Job.status.in_(ACTIVE_STATUSES))).scalar()
+
+
+def submit_job(db: Session, kind: str, params: dict, max_attempts: int | None = None) -> Job:
+    now = datetime.utcnow()
+    job = Job(
+        kind=kind,
+        params=params,
+        status=JobStatus.queued,
+        max_attempts=max_attempts or ConfigSettings.JOB_MAX_ATTEMPTS,
+        run_after=now,
+        created_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_runner.wake()
+    return job
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    now = datetime.utcnow()
+    db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == JobStatus.queued)
+        .values(status=JobStatus.cancelled, cancel_requested=True, finished_at=now)
+    )
+    db.execute(update(Job).where(Job.id == job.id, Job.status == JobStatus.running).values(cancel_requested=True))
+    db.commit()
+    db.refresh(job)
+    return job
@@ -0,0 +1,155 @@
+import asyncio
+from typing import Literal
+
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import NullPool
+
+from app.instance.config import ConfigSettings
+from app.services.bulk import BULK_SPECS, BulkImport, BulkMode, BulkOptions
+from app.services.cache import response_cache
+from app.services.cascade import CASCADE_PARENTS, delete_with_books
+from app.services.changes import compact_changes
+from app.services.database import DATABASE_URL, SessionLocal, engine, make_async_engine
+from app.services.facets import rebuild_facet_counts
+from app.services.jobs import JobContext, JobFailed, JobKind
+
+
+CatalogTable = Literal['authors', 'books', 'categories', 'publishers']
+
+WARM_CACHE_PATHS = ('/books/', '/books/facets', '/authors/', '/categories/', '/publishers/')
+
+
+class NoParams(BaseModel):
+    pass
+
+
+class CascadeDeleteParams(BaseModel):
+    entity: Literal['authors', 'categories', 'publishers']
+    id: int
+
+
+class ImportParams(BaseModel):
+    entity: CatalogTable
+    records: list[dict]
+    mode: BulkMode = BulkMode.best_effort
+    batch_size: int = Field(ConfigSettings.BULK_DEFAULT_BATCH_SIZE, ge=1, le=ConfigSettings.BULK_MAX_BATCH_SIZE)
+
+
+class CompactChangesParams(BaseModel):
+    retention_seconds: int = Field(ConfigSettings.CHANGES_RETENTION_SECONDS, ge=0)
+
+
+class ReindexParams(BaseModel):
+    tables: list[CatalogTable] = ['authors', 'books', 'categories', 'publishers']
+
+
+class WarmCacheParams(BaseModel):
+    paths: list[str] = list(WARM_CACHE_PATHS)
+
+
+def cascade_delete(context: JobContext, params: CascadeDeleteParams):
+    model, foreign_key = CASCADE_PARENTS[params.entity]
+    with SessionLocal() as db:
+        result = delete_with_books(db, model, params.id, foreign_key, on_progress=context.progress)
+    if result is None:
+        raise JobFailed(f'{model.__name__} not found.')
+    return result
+
+
+def compact_change_log(context: JobContext, params: CompactChangesParams):
+    with SessionLocal() as db:
+        return compact_changes(db, params.retention_seconds)
+
+
+def import_records(context: JobContext, params: ImportParams):
+    spec = BULK_SPECS[params.entity]
+    options = BulkOptions(mode=params.mode, batch_size=params.batch_size)
+    total = len(params.records)
+
+    async def records():
+        for number, record in enumerate(params.records, 1):
+            yield record
+            if number % params.batch_size == 0:
+                context.progress(number, total)
+
+    # Runs on the job thread's own event loop; the app engine's pooled connections belong to the
+    # request loop, so the import gets an unpooled engine of its own.
+    async def run():
+        job_engine = make_async_engine(DATABASE_URL, poolclass=NullPool)
+        try:
+            async with AsyncSession(job_engine, expire_on_commit=False) as db:
+                return await BulkImport(db, spec, options).run(records())
+        finally:
+            await job_engine.dispose()
+
+    report = asyncio.run(run())
+    context.progress(total, total)
+    return report
+
+
+def rebuild_facets(context: JobContext, params: NoParams):
+    with SessionLocal() as db:
+        rebuild_facet_counts(db)
+        db.commit()
+    response_cache.invalidate('books')
+
+
+def reindex(context: JobContext, params: ReindexParams):
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        for done, table in enumerate(params.tables, 1):
+            if connection.dialect.name == 'postgresql':
+                connection.exec_driver_sql(f'REINDEX TABLE CONCURRENTLY {table}')
+            else:
+                connection.exec_driver_sql(f'REINDEX {table}')
+            connection.exec_driver_sql(f'ANALYZE {table}')
+            context.progress(done, len(params.tables))
+    return {'tables': params.tables}
+
+
+async def asgi_get(app, path: str) -> int:
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': None,
+        'server': None,
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await app(scope, receive, send)
+    return statuses[0]
+
+
+def warm_cache(context: JobContext, params: WarmCacheParams):
+    statuses = {}
+    for done, path in enumerate(params.paths, 1):
+        statuses[path] = context.run_async(asgi_get(context.app, path), ConfigSettings.SERVER_TIMEOUT)
+        context.progress(done, len(params.paths))
+    return {'paths': statuses}
+
+
+JOB_KINDS = {
+    'cascade_delete': JobKind(CascadeDeleteParams, cascade_delete),
+    'compact_changes': JobKind(CompactChangesParams, compact_change_log),
+    'import': JobKind(ImportParams, import_records),
+    'rebuild_facets': JobKind(NoParams, rebuild_facets),
+    'reindex': JobKind(ReindexParams, reindex),
+    'warm_cache': JobKind(WarmCacheParams, warm_cache),
+}
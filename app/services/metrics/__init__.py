@@ -0,0 +1,257 @@
+import bisect
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from app.instance.config import ConfigSettings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'http_requests_total': ('counter', 'Total HTTP requests by route, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by route and method.'),
+    'http_requests_in_progress': ('gauge', 'HTTP requests currently being served.'),
+    'db_queries_total': ('counter', 'SQL statements executed by route.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent executing SQL statements by route.'),
+}
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+current_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    'current_request_stats', default=None
+)
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name: str, labels: tuple, value: float = 1.0):
+        with self._lock:
+            self.counters[(name, labels)] += value
+
+    def gauge_add(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            self.gauges[(name, labels)] += value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[(name, labels)] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(self.buckets, value)] += 1
+            histogram[-1] += value
+
+    def gauge_total(self, name: str) -> float:
+        with self._lock:
+            return sum(value for (gauge, _), value in self.gauges.items() if gauge == name)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'gauges': [[name, list(labels), value] for (name, labels), value in self.gauges.items()],
+                'histograms': [[name, list(labels), list(values)] for (name, labels), values in self.histograms.items()],
+            }
+
+
+registry = MetricsRegistry()
+
+
+def merge_snapshots(snapshots) -> dict:
+    merged = {'counters': defaultdict(float), 'gauges': defaultdict(float), 'histograms': {}}
+    for snapshot in snapshots:
+        for kind in ('counters', 'gauges'):
+            for name, labels, value in snapshot[kind]:
+                merged[kind][(name, tuple(map(tuple, labels)))] += value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            current = merged['histograms'].setdefault(key, [0] * len(values))
+            merged['histograms'][key] = [a + b for a, b in zip(current, values)]
+    return merged
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels) + '}'
+
+
+def render_prometheus(merged: dict, buckets=LATENCY_BUCKETS) -> str:
+    samples = defaultdict(list)
+    for kind in ('counters', 'gauges'):
+        for (name, labels), value in sorted(merged[kind].items()):
+            samples[name].append(f'{name}{format_labels(labels)} {value}')
+
+    for (name, labels), values in sorted(merged['histograms'].items()):
+        cumulative = 0
+        for bound, count in zip((*buckets, '+Inf'), values[:-1]):
+            cumulative += count
+            samples[name].append(f'{name}_bucket{format_labels((*labels, ("le", bound)))} {cumulative}')
+        samples[name].append(f'{name}_sum{format_labels(labels)} {values[-1]}')
+        samples[name].append(f'{name}_count{format_labels(labels)} {cumulative}')
+
+    lines = []
+    for name in sorted(samples):
+        metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        lines.extend(samples[name])
+    return '\n'.join(lines) + '\n'
+
+
+class MultiprocessStore:
+    def __init__(self, directory: str, flush_interval: float):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._flushed_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def flush(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(path, os.path.join(self.directory, f'{os.getpid()}.json'))
+
+    def collect(self) -> dict:
+        self.flush(force=True)
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            pid = int(os.path.basename(path).split('.')[0])
+            if not process_alive(pid):
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+        return merge_snapshots(snapshots)
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+multiprocess_store = (
+    MultiprocessStore(ConfigSettings.METRICS_MULTIPROC_DIR, ConfigSettings.METRICS_FLUSH_INTERVAL)
+    if ConfigSettings.METRICS_MULTIPROC_DIR else None
+)
+
+
+def collect_metrics() -> str:
+    if multiprocess_store is not None:
+        return render_prometheus(multiprocess_store.collect())
+    return render_prometheus(merge_snapshots([registry.snapshot()]))
+
+
+def route_template(scope) -> str:
+    app = scope.get('app')
+    for route in getattr(app, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        method = scope['method']
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        registry.gauge_add('http_requests_in_progress', (('method', method),), 1)
+        start = time.perf_counter()
+
+        async def record_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            route = route_template(scope)
+            registry.gauge_add('http_requests_in_progress', (('method', method),), -1)
+            registry.inc('http_requests_total', (('route', route), ('method', method), ('status', str(status_code))))
+            registry.observe('http_request_duration_seconds', (('route', route), ('method', method)), elapsed)
+            if stats.queries:
+                registry.inc('db_queries_total', (('route', route),), stats.queries)
+                registry.inc('db_query_duration_seconds_total', (('route', route),), stats.db_time)
+            if multiprocess_store is not None:
+                multiprocess_store.flush()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request_stats.get() is not None:
+        conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+
+def record_query(conn):
+    stats = current_request_stats.get()
+    start_times = conn.info.get('query_start_times')
+    if stats is None or not start_times:
+        return
+
+    stats.queries += 1
+    stats.db_time += time.perf_counter() - start_times.pop()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_query(conn)
+
+
+# A statement that raises never reaches after_cursor_execute; close its timing here so the start
+# time does not stay on the connection for the next statement to pop.
+@event.listens_for(Engine, 'handle_error')
+def handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.execution_context is not None:
+        record_query(exception_context.connection)
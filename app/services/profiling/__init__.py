@@ -0,0 +1,192 @@
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.instance.config import ConfigSettings
+from app.services.metrics import route_template
+
+
+logger = logging.getLogger('app.profiling')
+
+IN_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+class QueryRecord:
+    __slots__ = ('statement', 'duration', 'rows')
+
+    def __init__(self, statement: str, duration: float, rows: int):
+        self.statement = statement
+        self.duration = duration
+        self.rows = rows
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries: list[QueryRecord] = []
+        self.spans: dict[str, float] = {}
+        self.endpoint_done: float | None = None
+
+    def add_span(self, name: str, duration: float):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    @property
+    def db_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated_shapes(self, threshold: int):
+        shapes = Counter(statement_shape(query.statement) for query in self.queries)
+        return [(shape, count) for shape, count in shapes.items() if count >= threshold]
+
+
+current_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    'current_profile', default=None
+)
+
+
+def statement_shape(statement: str) -> str:
+    shape = IN_LIST.sub('(...)', statement)
+    shape = NUMBER.sub('N', shape)
+    return ' '.join(shape.split())
+
+
+@contextmanager
+def span(name: str):
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - start)
+
+
+def server_timing(profile: RequestProfile, total: float) -> str:
+    spans = {'db': profile.db_time, **profile.spans, 'total': total}
+    entries = [f'{name};dur={duration * 1000:.1f}' for name, duration in spans.items()]
+    entries.insert(1, f'queries;desc="{len(profile.queries)}"')
+    return ', '.join(entries)
+
+
+def log_profile(profile: RequestProfile, method: str, route: str):
+    threshold = ConfigSettings.SLOW_QUERY_THRESHOLD_MS / 1000
+    for query in profile.queries:
+        if query.duration >= threshold:
+            logger.warning(json.dumps({
+                'event': 'slow_query',
+                'method': method,
+                'route': route,
+                'duration_ms': round(query.duration * 1000, 2),
+                'rows': query.rows,
+                'statement': query.statement,
+            }))
+
+    for shape, count in profile.repeated_shapes(ConfigSettings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(json.dumps({
+            'event': 'probable_n_plus_one',
+            'method': method,
+            'route': route,
+            'count': count,
+            'statement': shape,
+        }))
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                now = time.perf_counter()
+                if profile.endpoint_done is not None:
+                    profile.add_span('serialize', now - profile.endpoint_done)
+                timing = server_timing(profile, now - start)
+                message = {**message, 'headers': [*message.get('headers', []), (b'server-timing', timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            log_profile(profile, scope['method'], route_template(scope))
+
+
+def mark_endpoint_done():
+    profile = current_profile.get()
+    if profile is not None:
+        profile.endpoint_done = time.perf_counter()
+
+
+def timed_endpoint(call):
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                mark_endpoint_done()
+    else:
+        @functools.wraps(call)
+        def wrapper(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                mark_endpoint_done()
+    return wrapper
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault('profile_start_times', []).append(time.perf_counter())
+
+
+def record_query(conn, statement: str, rows: int):
+    profile = current_profile.get()
+    start_times = conn.info.get('profile_start_times')
+    if profile is None or not start_times:
+        return
+
+    duration = time.perf_counter() - start_times.pop()
+    profile.queries.append(QueryRecord(statement, duration, rows))
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_query(conn, statement, cursor.rowcount)
+
+
+# Statements that raise skip after_cursor_execute; pop their start time here instead.
+def handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.execution_context is not None:
+        record_query(exception_context.connection, exception_context.statement, -1)
+
+
+def install_profiling(app):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not hasattr(route.dependant.call, '__wrapped__'):
+            route.dependant.call = timed_endpoint(route.dependant.call)
+
+    if not event.contains(Engine, 'before_cursor_execute', before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(Engine, 'handle_error', handle_error)
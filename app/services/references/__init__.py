@@ -0,0 +1,163 @@
+import logging
+import time
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.instance.config import ConfigSettings
+from app.models import Author, Category, Change, Publisher
+from app.services.changes import ChangeOp, compacted_through
+from app.services.references.stores import (
+    REFERENCE_ENTITIES,
+    LocalReferenceStore,
+    SharedReferenceStore,
+    SnapshotTooLarge,
+)
+
+
+logger = logging.getLogger('app.references')
+
+REFERENCE_MODELS = {
+    'authors': Author,
+    'categories': Category,
+    'publishers': Publisher,
+}
+
+
+def load_references(db: Session) -> dict[str, dict[int, str]]:
+    return {
+        entity: dict(db.execute(select(model.id, model.name)).all())
+        for entity, model in REFERENCE_MODELS.items()
+    }
+
+
+def change_head(db: Session) -> int:
+    return db.execute(select(func.max(Change.id))).scalar() or 0
+
+
+def reference_changes(db: Session, cursor: int):
+    return db.execute(
+        select(Change.id, Change.entity, Change.entity_id, Change.op, Change.data)
+        .where(Change.entity.in_(REFERENCE_ENTITIES), Change.id > cursor)
+        .order_by(Change.id)
+    ).all()
+
+
+def apply_changes(maps: dict[str, dict[int, str]], changes):
+    for change in changes:
+        if change['op'] == ChangeOp.deleted:
+            maps[change['entity']].pop(change['entity_id'], None)
+        else:
+            maps[change['entity']][change['entity_id']] = change['data']['name']
+
+
+class ReferenceData:
+    def __init__(self, refresh_seconds: float, reload_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self.store = None
+
+    @property
+    def available(self) -> bool:
+        return self.store is not None
+
+    def open(self, shared: bool, shm_name: str, max_bytes: int):
+        if shared:
+            self.store = SharedReferenceStore(shm_name, max_bytes)
+        else:
+            self.store = LocalReferenceStore(max_bytes)
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def refresh(self, db: Session):
+        store = self.store
+        if store is None:
+            return
+
+        cursor, refreshed_at, _ = store.state()
+        if cursor is not None and time.time() - refreshed_at < self.refresh_seconds:
+            return
+
+        with store.writer() as acquired:
+            if not acquired:
+                return
+
+            cursor, refreshed_at, reloaded_at = store.state()
+            now = time.time()
+            if cursor is not None and now - refreshed_at < self.refresh_seconds:
+                return
+
+            try:
+                if cursor is None or now - reloaded_at >= self.reload_seconds or cursor < compacted_through(db):
+                    head = change_head(db)
+                    store.replace(load_references(db), head, now, now)
+                    return
+
+                changes = reference_changes(db, cursor)
+                if not changes:
+                    store.touch(now)
+                    return
+
+                maps = store.maps()
+                apply_changes(maps, [change._mapping for change in changes])
+                store.replace(maps, changes[-1].id, now, reloaded_at)
+            except SnapshotTooLarge as e:
+                self.disable(e)
+
+    def apply(self, changes):
+        store = self.store
+        patches = [
+            (change['id'], change['entity'], change['entity_id'],
+             None if change['op'] == ChangeOp.deleted else change['data']['name'])
+            for change in changes
+            if change['entity'] in REFERENCE_ENTITIES
+        ]
+        if store is None or not patches:
+            return
+
+        # Journal the writes next to the snapshot instead of repacking it; lookups prefer entries newer
+        # than the snapshot cursor, and the next refresh folds them in by replaying the feed.
+        store.patch(patches)
+
+    def disable(self, e: SnapshotTooLarge):
+        logger.warning(
+            'Reference snapshot needs %s bytes, over the %s byte budget; disabling it',
+            e, ConfigSettings.REFERENCE_SNAPSHOT_MAX_BYTES,
+        )
+        self.store = None
+
+    def names(self, db: Session, model, ids) -> dict[int, str]:
+        self.refresh(db)
+        store = self.store
+        entity = model.__tablename__
+        names = {}
+        missing = []
+        for id in ids:
+            name = store.name(entity, id) if store is not None else None
+            if name is None:
+                missing.append(id)
+            else:
+                names[id] = name
+
+        if missing:
+            names.update(db.execute(select(model.id, model.name).where(model.id.in_(missing))).all())
+        return names
+
+    def exists(self, db: Session, model, id: int) -> bool:
+        return id in self.names(db, model, [id])
+
+
+reference_data = ReferenceData(
+    refresh_seconds=ConfigSettings.REFERENCE_SNAPSHOT_REFRESH_SECONDS,
+    reload_seconds=ConfigSettings.REFERENCE_SNAPSHOT_RELOAD_SECONDS,
+)
+
+
+# Apply reference writes to the snapshot as soon as they commit, so this worker (and every worker
+# on the host when the snapshot is shared) never renders or caches names older than its own writes.
+@event.listens_for(Session, 'after_commit')
+def apply_committed_references(session):
+    reference_data.apply(session.info.pop('committed_changes', ()))
@@ -0,0 +1,326 @@
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from itertools import accumulate
+
+
+REFERENCE_ENTITIES = ('authors', 'categories', 'publishers')
+
+# seq, cursor, refreshed_at, reloaded_at, payload length
+HEADER = struct.Struct('<QqddQ')
+SEQ = struct.Struct('<Q')
+COUNT = struct.Struct('<Q')
+
+SEQLOCK_RETRIES = 100
+
+# Writes that committed since the snapshot cursor are journaled next to it, so they show up without
+# repacking the snapshot. seq, count, overflow_through; then change id, entity id, entity index,
+# has name, name length and name per entry. Names that do not fit are journaled without one.
+JOURNAL = struct.Struct('<Qqq')
+JOURNAL_NAME_BYTES = 96
+JOURNAL_ENTRY = struct.Struct(f'<qqBBH{JOURNAL_NAME_BYTES}s')
+JOURNAL_SLOTS = 1024
+JOURNAL_SIZE = JOURNAL.size + JOURNAL_SLOTS * JOURNAL_ENTRY.size
+
+
+class SnapshotTooLarge(Exception):
+    pass
+
+
+def packed_size(maps: dict[str, dict[int, str]]) -> int:
+    size = 0
+    for entity in REFERENCE_ENTITIES:
+        names = maps[entity]
+        size += COUNT.size + len(names) * 12 + 4 + sum(len(name.encode()) for name in names.values())
+    return size
+
+
+def pack_references(maps: dict[str, dict[int, str]]) -> bytes:
+    parts = []
+    for entity in REFERENCE_ENTITIES:
+        items = sorted(maps[entity].items())
+        names = [name.encode() for _, name in items]
+        parts.append(COUNT.pack(len(items)))
+        parts.append(array('q', [id for id, _ in items]).tobytes())
+        parts.append(array('I', accumulate((len(name) for name in names), initial=0)).tobytes())
+        parts.append(b''.join(names))
+    return b''.join(parts)
+
+
+def packed_sections(buffer: memoryview) -> dict:
+    sections = {}
+    offset = 0
+    for entity in REFERENCE_ENTITIES:
+        count = COUNT.unpack_from(buffer, offset)[0]
+        offset += COUNT.size
+        ids = buffer[offset:offset + count * 8].cast('q')
+        offset += count * 8
+        offsets = buffer[offset:offset + (count + 1) * 4].cast('I')
+        offset += (count + 1) * 4
+        names = buffer[offset:offset + offsets[count]]
+        offset += offsets[count]
+        sections[entity] = (ids, offsets, names)
+    return sections
+
+
+def packed_name(section, id: int) -> str | None:
+    ids, offsets, names = section
+    index = bisect_left(ids, id)
+    if index == len(ids) or ids[index] != id:
+        return None
+    return bytes(names[offsets[index]:offsets[index + 1]]).decode()
+
+
+def pack_patch(change_id: int, entity: str, id: int, name: str | None) -> bytes:
+    encoded = name.encode() if name is not None else b''
+    if name is None or len(encoded) > JOURNAL_NAME_BYTES:
+        return JOURNAL_ENTRY.pack(change_id, id, REFERENCE_ENTITIES.index(entity), False, 0, b'')
+    return JOURNAL_ENTRY.pack(change_id, id, REFERENCE_ENTITIES.index(entity), True, len(encoded), encoded)
+
+
+def unpack_patch(buffer, offset: int) -> tuple[int, str, int, str | None]:
+    change_id, id, entity, has_name, length, name = JOURNAL_ENTRY.unpack_from(buffer, offset)
+    return change_id, REFERENCE_ENTITIES[entity], id, name[:length].decode() if has_name else None
+
+
+def latest_patches(patches, latest=None) -> dict[tuple[str, int], tuple[int, str | None]]:
+    latest = dict(latest or {})
+    for change_id, entity, id, name in patches:
+        if (entity, id) not in latest or latest[entity, id][0] < change_id:
+            latest[entity, id] = (change_id, name)
+    return latest
+
+
+def unpack_references(buffer: memoryview) -> dict[str, dict[int, str]]:
+    maps = {}
+    for entity, (ids, offsets, names) in packed_sections(buffer).items():
+        maps[entity] = {
+            id: bytes(names[offsets[index]:offsets[index + 1]]).decode() for index, id in enumerate(ids)
+        }
+    return maps
+
+
+class LocalReferenceStore:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._maps = {entity: {} for entity in REFERENCE_ENTITIES}
+        self._state = (None, 0.0, 0.0)
+        self._patches = {}
+        self._lock = threading.Lock()
+        self._patch_lock = threading.Lock()
+
+    def state(self) -> tuple[int | None, float, float]:
+        return self._state
+
+    def name(self, entity: str, id: int) -> str | None:
+        cursor = self._state[0]
+        patch = self._patches.get((entity, id))
+        if patch is not None and (cursor is None or patch[0] > cursor):
+            return patch[1]
+        return self._maps[entity].get(id)
+
+    def maps(self) -> dict[str, dict[int, str]]:
+        return {entity: dict(names) for entity, names in self._maps.items()}
+
+    def replace(self, maps, cursor: int, refreshed_at: float, reloaded_at: float):
+        if packed_size(maps) > self.max_bytes:
+            raise SnapshotTooLarge(packed_size(maps))
+        self._maps = maps
+        self._state = (cursor, refreshed_at, reloaded_at)
+        with self._patch_lock:
+            self._patches = {
+                key: patch for key, patch in self._patches.items() if cursor is not None and patch[0] > cursor
+            }
+
+    def patch(self, patches):
+        with self._patch_lock:
+            self._patches = latest_patches(patches, self._patches)
+
+    def touch(self, refreshed_at: float):
+        cursor, _, reloaded_at = self._state
+        self._state = (cursor, refreshed_at, reloaded_at)
+
+    def close(self):
+        pass
+
+    @contextmanager
+    def writer(self, blocking: bool = False):
+        acquired = self._lock.acquire(blocking=blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._lock.release()
+
+
+class SharedReferenceStore:
+    def __init__(self, name: str, max_bytes: int):
+        from multiprocessing import resource_tracker, shared_memory
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + JOURNAL_SIZE + max_bytes)
+            HEADER.pack_into(self.shm.buf, 0, 0, -1, 0.0, 0.0, 0)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+        # The segment outlives any single worker; keep the resource tracker from unlinking it.
+        resource_tracker.unregister(self.shm._name, 'shared_memory')
+
+        self.payload_offset = HEADER.size + JOURNAL_SIZE
+        self.capacity = self.shm.size - self.payload_offset
+        self.lock_path = os.path.join(tempfile.gettempdir(), f'{name}.lock')
+        self.journal_lock_path = os.path.join(tempfile.gettempdir(), f'{name}.journal.lock')
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._sections = (None, None)
+        self._patches = (None, {}, 0)
+
+    def read_header(self) -> tuple:
+        buffer = self.shm.buf
+        for _ in range(SEQLOCK_RETRIES):
+            header = HEADER.unpack_from(buffer, 0)
+            if header[0] % 2 == 0 and SEQ.unpack_from(buffer, 0)[0] == header[0]:
+                return header
+            time.sleep(0)
+        return HEADER.unpack_from(buffer, 0)
+
+    def state(self) -> tuple[int | None, float, float]:
+        _, cursor, refreshed_at, reloaded_at, _ = self.read_header()
+        return (None if cursor < 0 else cursor), refreshed_at, reloaded_at
+
+    def patches(self) -> tuple[dict[tuple[str, int], tuple[int, str | None]], int]:
+        buffer = self.shm.buf
+        for _ in range(SEQLOCK_RETRIES):
+            seq, count, overflow_through = JOURNAL.unpack_from(buffer, HEADER.size)
+            cached_seq, patches, cached_overflow = self._patches
+            if cached_seq == seq:
+                return patches, cached_overflow
+            if seq % 2:
+                time.sleep(0)
+                continue
+
+            try:
+                offsets = range(HEADER.size + JOURNAL.size, HEADER.size + JOURNAL.size + count * JOURNAL_ENTRY.size,
+                                JOURNAL_ENTRY.size)
+                patches = latest_patches(unpack_patch(buffer, offset) for offset in offsets)
+            except (IndexError, UnicodeDecodeError, struct.error):
+                continue
+
+            if SEQ.unpack_from(buffer, HEADER.size)[0] == seq:
+                self._patches = (seq, patches, overflow_through)
+                return patches, overflow_through
+        # Treat every journaled write as unknown so lookups fall back to the database.
+        return {}, 2 ** 63 - 1
+
+    def name(self, entity: str, id: int) -> str | None:
+        buffer = self.shm.buf
+        for _ in range(SEQLOCK_RETRIES):
+            seq, cursor, _, _, length = HEADER.unpack_from(buffer, 0)
+            patches, overflow_through = self.patches()
+            if overflow_through > max(cursor, 0):
+                return None
+            patch = patches.get((entity, id))
+            if patch is not None and patch[0] > cursor:
+                return patch[1]
+            if cursor < 0:
+                return None
+            if seq % 2:
+                time.sleep(0)
+                continue
+
+            try:
+                sections_seq, sections = self._sections
+                if sections_seq != seq:
+                    sections = packed_sections(buffer[self.payload_offset:self.payload_offset + length])
+                    self._sections = (seq, sections)
+                name = packed_name(sections[entity], id)
+            except (IndexError, TypeError, ValueError, struct.error):
+                name = None
+
+            if SEQ.unpack_from(buffer, 0)[0] == seq:
+                return name
+        return None
+
+    def maps(self) -> dict[str, dict[int, str]]:
+        _, cursor, _, _, length = self.read_header()
+        if cursor < 0:
+            return {entity: {} for entity in REFERENCE_ENTITIES}
+        return unpack_references(self.shm.buf[self.payload_offset:self.payload_offset + length])
+
+    def write_header(self, cursor: int, refreshed_at: float, reloaded_at: float, length: int, payload=None):
+        buffer = self.shm.buf
+        seq = SEQ.unpack_from(buffer, 0)[0]
+        SEQ.pack_into(buffer, 0, seq + 1)
+        if payload is not None:
+            buffer[self.payload_offset:self.payload_offset + length] = payload
+        HEADER.pack_into(buffer, 0, seq + 2, cursor, refreshed_at, reloaded_at, length)
+
+    def replace(self, maps, cursor: int, refreshed_at: float, reloaded_at: float):
+        payload = pack_references(maps)
+        if len(payload) > self.capacity:
+            raise SnapshotTooLarge(len(payload))
+        self.write_header(cursor, refreshed_at, reloaded_at, len(payload), payload)
+
+    def touch(self, refreshed_at: float):
+        _, cursor, _, reloaded_at, length = self.read_header()
+        self.write_header(cursor, refreshed_at, reloaded_at, length)
+
+    def patch(self, patches):
+        import fcntl
+
+        cursor = self.state()[0]
+        cursor = -1 if cursor is None else cursor
+        with self._journal_lock, open(self.journal_lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                buffer = self.shm.buf
+                seq, count, overflow_through = JOURNAL.unpack_from(buffer, HEADER.size)
+                start = HEADER.size + JOURNAL.size
+                # Entries at or below the cursor are already in the packed snapshot.
+                entries = [
+                    buffer[offset:offset + JOURNAL_ENTRY.size].tobytes()
+                    for offset in range(start, start + count * JOURNAL_ENTRY.size, JOURNAL_ENTRY.size)
+                    if JOURNAL_ENTRY.unpack_from(buffer, offset)[0] > cursor
+                ]
+                entries.extend(pack_patch(*patch) for patch in patches)
+                if len(entries) > JOURNAL_SLOTS:
+                    # Too many writes since the last refresh: fall back to the database until it catches up.
+                    overflow_through = max(overflow_through, max(patch[0] for patch in patches))
+                    entries = []
+
+                SEQ.pack_into(buffer, HEADER.size, seq + 1)
+                payload = b''.join(entries)
+                buffer[start:start + len(payload)] = payload
+                JOURNAL.pack_into(buffer, HEADER.size, seq + 2, len(entries), overflow_through)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def close(self):
+        self._sections = (None, None)
+        self.shm.close()
+
+    @contextmanager
+    def writer(self, blocking: bool = False):
+        import fcntl
+
+        if not self._lock.acquire(blocking=blocking):
+            yield False
+            return
+
+        try:
+            with open(self.lock_path, 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
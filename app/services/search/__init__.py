@@ -0,0 +1,77 @@
+from sqlalchemy import case, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Author, Book, Category, Publisher, SEARCHABLE_TABLES, search_document_sql
+
+
+SEARCHABLE_MODELS = {
+    'books': Book,
+    'authors': Author,
+    'categories': Category,
+    'publishers': Publisher,
+}
+
+
+def like_pattern(q: str) -> str:
+    escaped = q.replace('/', '//').replace('%', '/%').replace('_', '/_')
+    return f'%{escaped}%'
+
+
+class PostgresSearchEngine:
+
+    def query(self, model, q: str, limit: int):
+        columns = SEARCHABLE_TABLES[model.__table__]
+        document = literal_column(f"to_tsvector('simple', {search_document_sql(columns)})")
+        ts_query = func.plainto_tsquery('simple', q)
+        rank = func.greatest(func.similarity(model.name, q), func.ts_rank(document, ts_query))
+
+        return (
+            select(model.id, model.name, rank.label('rank'))
+            .where(or_(model.name.ilike(like_pattern(q), escape='/'), document.op('@@')(ts_query)))
+            .order_by(rank.desc(), model.id)
+            .limit(limit)
+        )
+
+
+class FallbackSearchEngine:
+
+    def query(self, model, q: str, limit: int):
+        pattern = like_pattern(q)
+        conditions = [model.name.ilike(pattern, escape='/')]
+        ranks = [
+            (func.lower(model.name) == q.lower(), 1.0),
+            (model.name.ilike(pattern[1:], escape='/'), 0.75),
+            (conditions[0], 0.5),
+        ]
+        if 'description' in SEARCHABLE_TABLES[model.__table__]:
+            conditions.append(model.description.ilike(pattern, escape='/'))
+            ranks.append((conditions[1], 0.25))
+
+        rank = case(*ranks, else_=0.0)
+        return (
+            select(model.id, model.name, rank.label('rank'))
+            .where(or_(*conditions))
+            .order_by(rank.desc(), model.id)
+            .limit(limit)
+        )
+
+
+def get_search_engine(db: Session):
+    if db.get_bind().dialect.name == 'postgresql':
+        return PostgresSearchEngine()
+    return FallbackSearchEngine()
+
+
+def search(db: Session, q: str, types: list[str], limit: int):
+    engine = get_search_engine(db)
+
+    hits = []
+    for entity_type in types:
+        rows = db.execute(engine.query(SEARCHABLE_MODELS[entity_type], q, limit))
+        hits.extend(
+            {'type': entity_type, 'id': row.id, 'name': row.name, 'rank': float(row.rank)}
+            for row in rows
+        )
+
+    hits.sort(key=lambda hit: -hit['rank'])
+    return hits[:limit]
@@ -0,0 +1,183 @@
+import argparse
+import json
+import sys
+
+from benchmarks.scenarios import MIXES
+from benchmarks.seed import CatalogSize
+
+
+def add_size_arguments(parser):
+    defaults = CatalogSize()
+    for field in CatalogSize._fields:
+        parser.add_argument(f'--{field}', type=int, default=getattr(defaults, field))
+
+
+def catalog_size(args) -> CatalogSize:
+    return CatalogSize(**{field: getattr(args, field) for field in CatalogSize._fields})
+
+
+def seed_command(args):
+    from app.services.database import engine
+    from benchmarks.seed import seed_catalog
+
+    seed_catalog(engine, catalog_size(args), seed=args.seed, batch_size=args.batch_size)
+
+
+def run_command(args):
+    from benchmarks.runner import (
+        HttpClient, compare_results, format_report, in_process_client, load_results, run_scenario, save_results,
+    )
+
+    with HttpClient(args.url) if args.url else in_process_client() as client:
+        results = run_scenario(
+            client,
+            mix=args.mix,
+            requests_count=args.requests,
+            concurrency=args.concurrency,
+            size=catalog_size(args),
+            seed=args.seed,
+            warmup=args.warmup,
+        )
+    results['target'] = args.url or 'in-process'
+    print(format_report(results))
+
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+def group_commit_command(args):
+    from app.instance.config import ConfigSettings
+    from benchmarks.runner import format_report, in_process_client, run_scenario
+
+    throughput = {}
+    with in_process_client() as client:
+        for enabled in (False, True):
+            ConfigSettings.GROUP_COMMIT_ENABLED = enabled
+            results = run_scenario(
+                client,
+                mix='onboarding',
+                requests_count=args.requests,
+                concurrency=args.concurrency,
+                size=catalog_size(args),
+                seed=args.seed,
+                warmup=args.warmup,
+            )
+            throughput[enabled] = results['throughput']
+            print(f"group commit {'on' if enabled else 'off'}")
+            print(format_report(results))
+
+    if throughput[False]:
+        print(f'speedup {throughput[True] / throughput[False]:.2f}x')
+
+
+def compare_command(args):
+    from benchmarks.runner import compare_results, load_results
+
+    regressions = compare_results(load_results(args.current), load_results(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    sys.exit(1 if regressions else 0)
+
+
+def micro_command(args):
+    if not args.reset:
+        sys.exit('micro deletes and reseeds the catalog and users in DATABASE_URL; pass --reset to allow it.')
+
+    from app.services.database import SessionLocal, engine
+    from benchmarks.micro import search_scaling_benchmark, serialization_benchmark
+
+    with SessionLocal() as db:
+        results = {'serialization': serialization_benchmark(db, rows=args.rows)}
+    results['search'] = search_scaling_benchmark(engine, args.search_sizes, seed=args.seed, reset=True)
+    print(json.dumps(results, indent=2))
+
+
+def explain_command(args):
+    from fastapi.testclient import TestClient
+
+    from app.instance.config import ConfigSettings
+    from app.main import app
+    from app.services.database import engine
+    from benchmarks.explain import check_query_plans
+
+    # The app is already imported by the time this runs; the cache middleware checks the setting per request.
+    ConfigSettings.RESPONSE_CACHE_ENABLED = False
+    with TestClient(app) as client:
+        results = check_query_plans(client, engine)
+
+    failures = [result for result in results if result['seq_scans']]
+    for result in results:
+        status = 'SEQ SCAN' if result['seq_scans'] else 'ok'
+        print(f"{status:<9}{result['name']}: {' '.join(result['statement'].split())[:120]}")
+        if result['seq_scans'] and args.verbose:
+            print(result['plan'])
+    sys.exit(1 if failures else 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed = commands.add_parser('seed', help='Load a deterministic catalog into DATABASE_URL.')
+    add_size_arguments(seed)
+    seed.add_argument('--seed', type=int, default=0)
+    seed.add_argument('--batch-size', type=int, default=10_000)
+    seed.set_defaults(handler=seed_command)
+
+    run = commands.add_parser('run', help='Run a request mix in-process or against --url.')
+    add_size_arguments(run)
+    run.add_argument('--mix', choices=sorted(MIXES), default='read_heavy')
+    run.add_argument('--requests', type=int, default=1_000)
+    run.add_argument('--concurrency', type=int, default=4)
+    run.add_argument('--warmup', type=int, default=50)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--url')
+    run.add_argument('--output')
+    run.add_argument('--baseline')
+    run.add_argument('--tolerance', type=float, default=0.10)
+    run.set_defaults(handler=run_command)
+
+    group_commit = commands.add_parser(
+        'group-commit', help='Compare onboarding write throughput with and without group commit, in-process.'
+    )
+    add_size_arguments(group_commit)
+    group_commit.add_argument('--requests', type=int, default=1_000)
+    group_commit.add_argument('--concurrency', type=int, default=32)
+    group_commit.add_argument('--warmup', type=int, default=50)
+    group_commit.add_argument('--seed', type=int, default=0)
+    group_commit.set_defaults(handler=group_commit_command)
+
+    compare = commands.add_parser('compare', help='Compare two saved results.')
+    compare.add_argument('current')
+    compare.add_argument('baseline')
+    compare.add_argument('--tolerance', type=float, default=0.10)
+    compare.set_defaults(handler=compare_command)
+
+    micro = commands.add_parser(
+        'micro', help='Serialization and search micro-benchmarks; search reseeds DATABASE_URL at each size.'
+    )
+    micro.add_argument('--rows', type=int, default=500)
+    micro.add_argument('--search-sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    micro.add_argument('--seed', type=int, default=0)
+    micro.add_argument(
+        '--reset', action='store_true', help='Allow wiping DATABASE_URL; point it at a benchmark database.'
+    )
+    micro.set_defaults(handler=micro_command)
+
+    explain = commands.add_parser('explain', help='Fail when hot routes sequentially scan books.')
+    explain.add_argument('--verbose', action='store_true')
+    explain.set_defaults(handler=explain_command)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
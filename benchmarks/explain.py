@@ -0,0 +1,89 @@
+import json
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+WATCHED_TABLES = ('books',)
+
+HOT_ROUTES = (
+    ('book by id', '/books/1', ('postgresql', 'sqlite')),
+    ('books by author', '/books/?author_id=1&limit=20', ('postgresql', 'sqlite')),
+    ('books by category', '/books/?category_id=1&limit=20', ('postgresql', 'sqlite')),
+    ('books by publisher', '/books/?publisher_id=1&limit=20', ('postgresql', 'sqlite')),
+    ('facets', '/books/facets', ('postgresql', 'sqlite')),
+    ('facets by category', '/books/facets?category_id=1', ('postgresql', 'sqlite')),
+    ('author with books', '/authors/1?include=books', ('postgresql', 'sqlite')),
+    ('category with books', '/categories/1?include=books', ('postgresql', 'sqlite')),
+    ('publisher with books', '/publishers/1?include=books', ('postgresql', 'sqlite')),
+    ('search books', '/search/?q=story&types=books', ('postgresql',)),
+)
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+@contextmanager
+def capture_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def postgres_seq_scans(plan) -> list[str]:
+    scans = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in WATCHED_TABLES:
+            scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', ()))
+    return scans
+
+
+def explain(connection, statement: str, parameters) -> tuple[list[str], str]:
+    if connection.dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return postgres_seq_scans(plan), json.dumps(plan)
+
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    details = [row[-1] for row in rows]
+    scans = []
+    for detail in details:
+        match = SQLITE_SCAN.match(detail)
+        if match and match.group(1) in WATCHED_TABLES:
+            scans.append(match.group(1))
+    return scans, '\n'.join(details)
+
+
+def check_query_plans(client, engine) -> list[dict]:
+    results = []
+    for name, path, dialects in HOT_ROUTES:
+        if engine.dialect.name not in dialects:
+            continue
+
+        with capture_statements(engine) as statements:
+            response = client.get(path)
+
+        for statement, parameters in statements:
+            with engine.connect() as connection:
+                scans, plan = explain(connection, statement, parameters)
+            results.append({
+                'name': name,
+                'path': path,
+                'status': response.status_code,
+                'statement': statement,
+                'seq_scans': scans,
+                'plan': plan,
+            })
+    return results
@@ -0,0 +1,82 @@
+import json
+import random
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.models import Book
+from app.schemas.loaders import load_for
+from app.schemas.schemas import BookReadWithAuthor
+from app.schemas.serializers import compile_serializer
+from app.services.search import SEARCHABLE_MODELS, search
+from benchmarks.seed import WORDS, CatalogSize, seed_catalog
+
+
+def timed(function, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'min_ms': round(timings[0] * 1000, 3),
+        'median_ms': round(timings[len(timings) // 2] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+    }
+
+
+def serialization_benchmark(db: Session, rows: int = 500, repeat: int = 20) -> dict:
+    books = load_for(db.query(Book), BookReadWithAuthor).order_by(Book.id).limit(rows).all()
+    serialize = compile_serializer(BookReadWithAuthor)
+
+    def pydantic_path():
+        return json.dumps(jsonable_encoder([BookReadWithAuthor.from_orm(book) for book in books])).encode()
+
+    def compiled_path():
+        return orjson.dumps([serialize(book) for book in books])
+
+    return {
+        'rows': len(books),
+        'pydantic_jsonable_encoder': timed(pydantic_path, repeat),
+        'compiled_orjson': timed(compiled_path, repeat),
+    }
+
+
+def search_benchmark(db: Session, queries: int = 50, limit: int = 20, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    terms = [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(queries)]
+    results = {}
+    for entity_type in (*SEARCHABLE_MODELS, 'all'):
+        types = list(SEARCHABLE_MODELS) if entity_type == 'all' else [entity_type]
+        pending = iter(terms)
+        results[entity_type] = timed(lambda: search(db, next(pending), types, limit), len(terms))
+    results['engine'] = db.get_bind().dialect.name
+    return results
+
+
+def scaled_catalog(books: int) -> CatalogSize:
+    return CatalogSize(
+        authors=max(1, books // 100), categories=50, publishers=max(1, books // 500), users=1, books=books
+    )
+
+
+def search_scaling_benchmark(
+    engine, sizes, queries: int = 50, limit: int = 20, seed: int = 0, reset: bool = False
+) -> dict:
+    if not reset:
+        raise ValueError('The search scaling benchmark deletes and reseeds the catalog and users; pass reset=True.')
+
+    runs = []
+    for books in sorted(sizes):
+        seed_catalog(engine, scaled_catalog(books), seed=seed)
+        with Session(engine) as db:
+            runs.append({'size': books, **search_benchmark(db, queries, limit, seed)})
+
+    first, last = runs[0], runs[-1]
+    growth = {'size': round(last['size'] / first['size'], 1)}
+    for entity_type in (*SEARCHABLE_MODELS, 'all'):
+        growth[entity_type] = round(last[entity_type]['median_ms'] / max(first[entity_type]['median_ms'], 0.001), 1)
+    return {'runs': runs, 'growth': growth}
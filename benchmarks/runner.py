@@ -0,0 +1,186 @@
+import json
+import platform
+import random
+import re
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.scenarios import MIXES, OPERATIONS, ScenarioState, choose_operations
+from benchmarks.seed import BENCHMARK_PASSWORD, CatalogSize, user_email
+
+
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class HttpClient(requests.Session):
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, *args, **kwargs):
+        return super().request(method, self.base_url + url, *args, **kwargs)
+
+
+def in_process_client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def scrape_queries(client) -> dict[str, list[float]]:
+    response = client.get('/metrics')
+    if response.status_code != 200:
+        return {}
+
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for line in response.text.splitlines():
+        match = SAMPLE.match(line)
+        if match is None:
+            continue
+        name, raw_labels, value = match.groups()
+        labels = dict(LABEL.findall(raw_labels))
+        if name == 'db_queries_total':
+            totals[labels['route']][0] += float(value)
+        elif name == 'http_requests_total':
+            totals[labels['route']][1] += float(value)
+    return totals
+
+
+def queries_per_request(before, after) -> dict[str, float]:
+    result = {}
+    for route, (queries, requests_) in after.items():
+        if route == '/metrics':
+            continue
+        delta_queries = queries - before.get(route, (0.0, 0.0))[0]
+        delta_requests = requests_ - before.get(route, (0.0, 0.0))[1]
+        if delta_requests:
+            result[route] = round(delta_queries / delta_requests, 2)
+    return result
+
+
+def run_scenario(
+    client,
+    mix: str = 'read_heavy',
+    requests_count: int = 1_000,
+    concurrency: int = 4,
+    size: CatalogSize = CatalogSize(),
+    seed: int = 0,
+    warmup: int = 50,
+):
+    state = ScenarioState(size, run_id=f'{seed}-{time.time_ns()}')
+    response = client.post('/token', data={'username': user_email(1), 'password': BENCHMARK_PASSWORD})
+    response.raise_for_status()
+    state.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    operations = choose_operations(MIXES[mix], warmup + requests_count, seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    def execute(index: int):
+        name = operations[index]
+        rng = random.Random(seed * 1_000_003 + index)
+        start = time.perf_counter()
+        response = OPERATIONS[name](client, rng, state)
+        elapsed = time.perf_counter() - start
+        return name, elapsed, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(execute, range(warmup)))
+
+        before = scrape_queries(client)
+        start = time.perf_counter()
+        for name, elapsed, status_code in executor.map(execute, range(warmup, warmup + requests_count)):
+            latencies[name].append(elapsed)
+            if status_code >= 400 and status_code != 404:
+                errors[name] += 1
+        duration = time.perf_counter() - start
+        after = scrape_queries(client)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'mix': mix,
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'seed': seed,
+        'catalog': size._asdict(),
+        'python': platform.python_version(),
+        'duration_seconds': round(duration, 3),
+        'throughput': round(requests_count / duration, 2),
+        'overall': summarize(all_latencies, sum(errors.values())),
+        'operations': {name: summarize(values, errors[name]) for name, values in sorted(latencies.items())},
+        'queries_per_request': queries_per_request(before, after),
+    }
+
+
+def summarize(latencies: list[float], errors: int) -> dict:
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def save_results(results: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float = 0.10) -> list[str]:
+    regressions = []
+    if current['throughput'] < baseline['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput']} -> {current['throughput']} req/s")
+
+    for name, stats in current['operations'].items():
+        base = baseline['operations'].get(name)
+        if base is None:
+            continue
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if stats[key] > base[key] * (1 + tolerance):
+                regressions.append(f'{name} {key} {base[key]} -> {stats[key]}')
+
+    for route, queries in current['queries_per_request'].items():
+        base = baseline['queries_per_request'].get(route)
+        if base is not None and queries > base:
+            regressions.append(f'{route} queries/request {base} -> {queries}')
+
+    return regressions
+
+
+def format_report(results: dict) -> str:
+    lines = [
+        f"{results['mix']}: {results['requests']} requests, concurrency {results['concurrency']}, "
+        f"{results['throughput']} req/s",
+        f"{'operation':<14}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for name, stats in {**results['operations'], 'overall': results['overall']}.items():
+        lines.append(
+            f"{name:<14}{stats['count']:>7}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+    if results['queries_per_request']:
+        lines.append('queries per request:')
+        lines.extend(f'  {route}: {queries}' for route, queries in sorted(results['queries_per_request'].items()))
+    return '\n'.join(lines)
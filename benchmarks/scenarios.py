@@ -0,0 +1,121 @@
+import random
+import threading
+
+from benchmarks.seed import BENCHMARK_PASSWORD, WORDS, CatalogSize, user_email
+
+
+class ScenarioState:
+    def __init__(self, size: CatalogSize, run_id: str):
+        self.size = size
+        self.run_id = run_id
+        self.headers = {}
+        self.created: list[int] = []
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def next_name(self) -> str:
+        with self._lock:
+            self._counter += 1
+            return f'bench-{self.run_id}-{self._counter}'
+
+    def add_created(self, book_id: int):
+        with self._lock:
+            self.created.append(book_id)
+
+    def pop_created(self) -> int | None:
+        with self._lock:
+            return self.created.pop() if self.created else None
+
+
+def login(client, rng: random.Random, state: ScenarioState):
+    email = user_email(rng.randint(1, state.size.users))
+    return client.post('/token', data={'username': email, 'password': BENCHMARK_PASSWORD})
+
+
+def list_books(client, rng: random.Random, state: ScenarioState):
+    return client.get('/books/', params={'limit': 50})
+
+
+def get_book(client, rng: random.Random, state: ScenarioState):
+    return client.get(f'/books/{rng.randint(1, state.size.books)}')
+
+
+def filter_books(client, rng: random.Random, state: ScenarioState):
+    return client.get('/books/', params={'author_id': rng.randint(1, state.size.authors), 'limit': 20})
+
+
+def search_catalog(client, rng: random.Random, state: ScenarioState):
+    return client.get('/search/', params={'q': rng.choice(WORDS), 'limit': 20})
+
+
+def get_author(client, rng: random.Random, state: ScenarioState):
+    return client.get(f'/authors/{rng.randint(1, state.size.authors)}')
+
+
+def book_payload(rng: random.Random, state: ScenarioState) -> dict:
+    return {
+        'name': state.next_name(),
+        'description': ' '.join(rng.choice(WORDS) for _ in range(8)),
+        'author_id': rng.randint(1, state.size.authors),
+        'category_id': rng.randint(1, state.size.categories),
+        'publisher_id': rng.randint(1, state.size.publishers),
+    }
+
+
+def create_book(client, rng: random.Random, state: ScenarioState):
+    response = client.post('/books/', json=book_payload(rng, state), headers=state.headers)
+    if response.status_code == 201:
+        state.add_created(response.json()['id'])
+    return response
+
+
+def create_author(client, rng: random.Random, state: ScenarioState):
+    return client.post('/authors/', json={'name': state.next_name()}, headers=state.headers)
+
+
+def patch_book(client, rng: random.Random, state: ScenarioState):
+    book_id = rng.randint(1, state.size.books)
+    return client.patch(f'/books/{book_id}', json=book_payload(rng, state), headers=state.headers)
+
+
+def delete_book(client, rng: random.Random, state: ScenarioState):
+    book_id = state.pop_created()
+    if book_id is None:
+        return create_book(client, rng, state)
+    return client.delete(f'/books/{book_id}', headers=state.headers)
+
+
+OPERATIONS = {
+    'login': login,
+    'list_books': list_books,
+    'get_book': get_book,
+    'filter_books': filter_books,
+    'search': search_catalog,
+    'get_author': get_author,
+    'create_book': create_book,
+    'create_author': create_author,
+    'patch_book': patch_book,
+    'delete_book': delete_book,
+}
+
+MIXES = {
+    'read_heavy': {
+        'list_books': 30, 'get_book': 30, 'filter_books': 15, 'search': 10, 'get_author': 10,
+        'login': 2, 'create_book': 2, 'patch_book': 1,
+    },
+    'mixed': {
+        'list_books': 20, 'get_book': 20, 'filter_books': 10, 'search': 10, 'get_author': 5,
+        'login': 5, 'create_book': 15, 'patch_book': 10, 'delete_book': 5,
+    },
+    'write_heavy': {
+        'get_book': 10, 'login': 5, 'create_book': 45, 'patch_book': 25, 'delete_book': 15,
+    },
+    'search': {'search': 100},
+    'onboarding': {'create_book': 70, 'create_author': 30},
+}
+
+
+def choose_operations(mix: dict[str, int], count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    names = list(mix)
+    return rng.choices(names, weights=[mix[name] for name in names], k=count)
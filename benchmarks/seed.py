@@ -0,0 +1,102 @@
+import random
+from typing import NamedTuple
+
+from sqlalchemy import delete, insert
+
+from app.auth.passwords import get_password_hash
+from app.models import Author, Book, Category, Publisher, User
+from app.services.database import Base
+from app.services.facets import rebuild_facet_counts
+
+
+WORDS = (
+    'ancient', 'atlas', 'beyond', 'blue', 'chronicle', 'city', 'code', 'dark', 'dawn', 'desert',
+    'dream', 'empire', 'field', 'fire', 'garden', 'ghost', 'glass', 'guide', 'harbor', 'history',
+    'house', 'iron', 'island', 'journey', 'kingdom', 'last', 'light', 'lost', 'machine', 'map',
+    'memory', 'midnight', 'mountain', 'night', 'ocean', 'paper', 'python', 'river', 'road', 'secret',
+    'shadow', 'silent', 'silver', 'star', 'stone', 'storm', 'story', 'summer', 'winter', 'world',
+)
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+class CatalogSize(NamedTuple):
+    authors: int = 1_000
+    categories: int = 50
+    publishers: int = 200
+    users: int = 100
+    books: int = 100_000
+
+
+def user_email(index: int) -> str:
+    return f'user{index:06d}@bench.example'
+
+
+def book_name(rng: random.Random, index: int) -> str:
+    return f"{' '.join(rng.choice(WORDS) for _ in range(3)).title()} #{index}"
+
+
+def iter_batches(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_catalog(engine, size: CatalogSize, seed: int = 0, batch_size: int = 10_000, reset: bool = True):
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        if reset:
+            for model in (Book, Author, Category, Publisher, User):
+                connection.execute(delete(model))
+
+        connection.execute(insert(Author), [
+            {'id': i, 'name': f'{rng.choice(WORDS).title()} Author {i}'} for i in range(1, size.authors + 1)
+        ])
+        connection.execute(insert(Category), [
+            {'id': i, 'name': f'{rng.choice(WORDS).title()} Category {i}', 'description': rng.choice(WORDS)}
+            for i in range(1, size.categories + 1)
+        ])
+        connection.execute(insert(Publisher), [
+            {'id': i, 'name': f'{rng.choice(WORDS).title()} Press {i}', 'description': rng.choice(WORDS)}
+            for i in range(1, size.publishers + 1)
+        ])
+
+        hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+        connection.execute(insert(User), [
+            {'id': i, 'email': user_email(i), 'hashed_password': hashed_password, 'is_active': True}
+            for i in range(1, size.users + 1)
+        ])
+
+    books = (
+        {
+            'id': i,
+            'name': book_name(rng, i),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(12)),
+            'author_id': rng.randint(1, size.authors),
+            'category_id': rng.randint(1, size.categories),
+            'publisher_id': rng.randint(1, size.publishers),
+        }
+        for i in range(1, size.books + 1)
+    )
+    for batch in iter_batches(books, batch_size):
+        with engine.begin() as connection:
+            connection.execute(insert(Book), batch)
+
+    with engine.begin() as connection:
+        rebuild_facet_counts(connection)
+
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as connection:
+            for model in (Author, Category, Publisher, User, Book):
+                table = model.__tablename__
+                connection.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+            connection.exec_driver_sql('ANALYZE')
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+DATABASE_DIR = tempfile.mkdtemp(prefix='library-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'test.db')}"
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+os.environ.setdefault('JOBS_ENABLED', 'false')
+os.environ.setdefault('RESPONSE_CACHE_ENABLED', 'false')
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect
+
+from app.auth.cache import token_cache
+from app.main import app
+from app.services.cache import response_cache
+from app.services.changes import seed_change_sequence
+from app.services.database import Base, async_engine, engine
+from app.services.references import reference_data
+from app.services.references.stores import REFERENCE_ENTITIES
+
+
+AUTH_HEADERS = {'Authorization': 'Bearer test-token'}
+
+
+@pytest.fixture(scope='session')
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clean_database(client):
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        if inspect(connection).has_table('sqlite_sequence'):
+            connection.exec_driver_sql('DELETE FROM sqlite_sequence')
+        seed_change_sequence(connection)
+
+    response_cache.backend.clear()
+    token_cache.clear()
+    reset_reference_snapshot()
+
+
+def reset_reference_snapshot():
+    if reference_data.store is not None:
+        reference_data.store.replace({entity: {} for entity in REFERENCE_ENTITIES}, None, 0.0, 0.0)
+
+
+@pytest.fixture
+def auth_headers():
+    return AUTH_HEADERS
+
+
+@pytest.fixture
+def count_queries():
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.strip().upper() != 'BEGIN':
+                statements.append(statement)
+
+        engines = (engine, async_engine.sync_engine)
+        for target in engines:
+            event.listen(target, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
+
+@pytest.fixture
+def catalog(client):
+    def seed(books: int, authors: int = 3, categories: int = 2, publishers: int = 2):
+        from benchmarks.seed import CatalogSize, seed_catalog
+
+        size = CatalogSize(authors=authors, categories=categories, publishers=publishers, users=0, books=books)
+        seed_catalog(engine, size, batch_size=1_000)
+        reset_reference_snapshot()
+        return size
+
+    return seed
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.auth import hashing
+from app.auth.cache import token_cache
+from app.auth.hashing import hashing_pool
+from app.auth.passwords import get_password_hash
+from app.services.database import engine
+
+
+def login(client, email: str = 'reader@example.com', password: str = 'secret') -> dict:
+    client.post('/users/', json={'email': email, 'password': password})
+    response = client.post('/token', data={'username': email, 'password': password})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+
+def test_login_rejects_a_wrong_password(client):
+    login(client)
+    response = client.post('/token', data={'username': 'reader@example.com', 'password': 'wrong'})
+    assert response.status_code == 401
+
+
+def test_slow_auth_queries_do_not_block_the_event_loop(client):
+    headers = login(client)
+    token_cache.clear()
+
+    # An exclusive lock makes every user lookup wait inside the database driver, like a slow query.
+    blocker = sqlite3.connect(engine.url.database, isolation_level=None)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            pending = [executor.submit(client.get, '/users/me/', headers=headers) for _ in range(4)]
+            time.sleep(0.3)
+
+            started = time.perf_counter()
+            assert client.get('/health_check').status_code == 200
+            elapsed = time.perf_counter() - started
+            assert not any(request.done() for request in pending)
+
+            blocker.execute('ROLLBACK')
+            responses = [request.result(timeout=10) for request in pending]
+    finally:
+        blocker.close()
+
+    assert elapsed < 0.25
+    assert [response.json()['email'] for response in responses] == ['reader@example.com'] * 4
+
+
+def test_saturated_hashing_pool_asks_clients_to_retry(client, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        release.wait(10)
+        return get_password_hash(password)
+
+    monkeypatch.setattr(hashing, 'get_password_hash', slow_hash)
+    monkeypatch.setattr(hashing_pool, 'max_pending', 1)
+    with ThreadPoolExecutor(1) as hashes, ThreadPoolExecutor(1) as executor:
+        monkeypatch.setattr(hashing_pool, '_executor', hashes)
+        first = executor.submit(client.post, '/users/', json={'email': 'first@example.com', 'password': 'secret'})
+        assert started.wait(10)
+
+        response = client.post('/users/', json={'email': 'second@example.com', 'password': 'secret'})
+        release.set()
+        assert first.result(timeout=10).status_code == 201
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from app.services.bulk import BulkImport
+
+
+NDJSON = {'Content-Type': 'application/x-ndjson'}
+CSV = {'Content-Type': 'text/csv'}
+
+
+def ndjson(*records) -> str:
+    return '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records) + '\n'
+
+
+def book(name: str, **values) -> dict:
+    return {'name': name, 'description': 'Imported.', 'author_id': 1, 'category_id': 1, 'publisher_id': 1, **values}
+
+
+def test_bulk_import_inserts_ndjson_rows(client, catalog, auth_headers):
+    catalog(books=1)
+
+    response = client.post(
+        '/books/bulk', data=ndjson(book('First import'), book('Second import', author_id=2)),
+        headers={**auth_headers, **NDJSON},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'mode': 'all_or_nothing', 'committed': True, 'received': 2, 'inserted': 2, 'failed': 0, 'errors': [],
+    }
+    books = client.get('/books/', params={'limit': 10}).json()['items']
+    assert {item['name']: item['author']['id'] for item in books if 'import' in item['name']} == {
+        'First import': 1, 'Second import': 2,
+    }
+
+
+def test_bulk_import_reads_quoted_newlines_in_csv(client, catalog, auth_headers):
+    catalog(books=1)
+    body = (
+        'name,description,author_id,category_id,publisher_id\n'
+        '"Multiline","First line\nsecond line, with a comma",1,1,1\n'
+        'Plain,Short,2,2,2\n'
+    )
+
+    response = client.post('/books/bulk', data=body, headers={**auth_headers, **CSV})
+
+    assert response.json()['inserted'] == 2
+    books = {item['name']: item for item in client.get('/books/', params={'limit': 10}).json()['items']}
+    assert books['Multiline']['description'] == 'First line\nsecond line, with a comma'
+    assert books['Plain']['author']['id'] == 2
+
+
+def test_bulk_import_reports_invalid_rows(client, catalog, auth_headers):
+    catalog(books=1)
+
+    response = client.post(
+        '/books/bulk', params={'mode': 'best_effort'},
+        data=ndjson(book('Valid'), '{not json', {'description': 'No name'}, book('Orphan', author_id=999)),
+        headers={**auth_headers, **NDJSON},
+    )
+
+    report = response.json()
+    assert (report['committed'], report['received'], report['inserted'], report['failed']) == (True, 4, 1, 3)
+    errors = {error['row']: error['detail'] for error in report['errors']}
+    assert errors[2] == "Invalid JSON."
+    assert ['name'] in [error['loc'] for error in errors[3]]
+    assert errors[4] == "Author not found."
+
+
+@pytest.mark.parametrize('mode, committed, inserted', [('all_or_nothing', False, 0), ('best_effort', True, 1)])
+def test_bulk_import_reports_duplicates(client, catalog, auth_headers, mode, committed, inserted):
+    catalog(books=1, authors=1)
+    existing = client.get('/authors/1').json()['name']
+
+    response = client.post(
+        '/authors/bulk', params={'mode': mode},
+        data=ndjson({'name': existing}, {'name': 'New author'}, {'name': 'New author'}),
+        headers={**auth_headers, **NDJSON},
+    )
+
+    report = response.json()
+    assert (report['committed'], report['inserted']) == (committed, inserted)
+    assert report['errors'] == [
+        {'row': 1, 'detail': "Author already exists."},
+        {'row': 3, 'detail': "Author already exists."},
+    ]
+    names = [author['name'] for author in client.get('/authors/', params={'limit': 10}).json()['items']]
+    assert names.count('New author') == inserted
+
+
+def test_bulk_import_maps_constraint_errors_per_row(client, catalog, auth_headers, monkeypatch):
+    catalog(books=1)
+    existing = client.get('/books/1').json()['name']
+
+    # Skip the up-front checks so the rows reach the database constraints.
+    async def validate(self, batch):
+        return [(row_number, record) for row_number, record in batch]
+
+    monkeypatch.setattr(BulkImport, 'validate', validate)
+    response = client.post(
+        '/books/bulk', params={'mode': 'best_effort'},
+        data=ndjson(book(existing), book('Orphan', category_id=999), book('Fits')),
+        headers={**auth_headers, **NDJSON},
+    )
+
+    report = response.json()
+    assert report['inserted'] == 1
+    assert report['errors'] == [
+        {'row': 1, 'detail': "Book already exists."},
+        {'row': 2, 'detail': "Category not found."},
+    ]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.instance.config import ConfigSettings
+from app.services.cache import (
+    CACHE_DEPENDENCIES,
+    CachedResponse,
+    MemoryBackend,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    SharedVersions,
+)
+
+
+@pytest.fixture
+def shared_caches():
+    name = f'test_cache_versions_{uuid.uuid4().hex[:12]}'
+    caches = [ResponseCache(MemoryBackend(100, SharedVersions(name)), ttl=60) for _ in range(2)]
+    yield caches
+    caches[0].backend.versions.shm.unlink()
+    for cache in caches:
+        cache.close()
+
+
+def cached_books(cache: ResponseCache) -> CachedResponse | None:
+    return cache.get(cache.build_key('/books/', b'limit=10', CACHE_DEPENDENCIES['/books']))
+
+
+def test_invalidation_in_one_worker_reaches_the_other(shared_caches):
+    first, second = shared_caches
+    response = CachedResponse('"etag"', 'application/json', b'{"items":[]}')
+    first.set(first.build_key('/books/', b'limit=10', CACHE_DEPENDENCIES['/books']), response)
+    assert cached_books(first) == response
+
+    second.invalidate('authors')
+
+    assert cached_books(first) is None
+    assert first.backend.get_versions(['authors', 'books']) == second.backend.get_versions(['authors', 'books']) == [1, 0]
+
+
+def test_local_versions_stay_private_to_a_backend():
+    first, second = MemoryBackend(100), MemoryBackend(100)
+    first.incr('books')
+    assert first.get_versions(['books']) == [1]
+    assert second.get_versions(['books']) == [0]
+
+
+def cache_books_response(read_replica: bool = False) -> ResponseCache:
+    async def app(scope, receive, send):
+        if read_replica:
+            scope.setdefault('state', {})['read_replica'] = True
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': b'{"items":[]}'})
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    cache = ResponseCache(MemoryBackend(100), ttl=300)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/books/', 'query_string': b'', 'headers': []}
+    asyncio.run(ResponseCacheMiddleware(app, cache)(scope, receive, send))
+    return cache
+
+
+def remaining_ttl(cache: ResponseCache) -> float:
+    [(expires_at, _)] = cache.backend._entries.values()
+    return expires_at - time.monotonic()
+
+
+def test_replica_responses_expire_within_the_replica_lag_bound(monkeypatch):
+    monkeypatch.setattr(ConfigSettings, 'RESPONSE_CACHE_ENABLED', True)
+    assert remaining_ttl(cache_books_response(read_replica=True)) <= ConfigSettings.READ_YOUR_WRITES_SECONDS
+    assert remaining_ttl(cache_books_response(read_replica=False)) > ConfigSettings.READ_YOUR_WRITES_SECONDS
+
+
+def test_disabling_the_cache_at_runtime_bypasses_the_middleware(monkeypatch):
+    monkeypatch.setattr(ConfigSettings, 'RESPONSE_CACHE_ENABLED', True)
+    assert cache_books_response().backend._entries
+
+    monkeypatch.setattr(ConfigSettings, 'RESPONSE_CACHE_ENABLED', False)
+    assert not cache_books_response().backend._entries
@@ -0,0 +1,36 @@
+from collections import Counter
+
+from app.instance.config import ConfigSettings
+
+
+FACET_RELATIONS = {'authors': 'author', 'categories': 'category', 'publishers': 'publisher'}
+
+def facet_counts(client) -> dict[str, dict[int, int]]:
+    facets = client.get('/books/facets').json()
+    return {name: {item['id']: item['count'] for item in items if item['count']} for name, items in facets.items()}
+
+
+def test_cascade_delete_in_single_book_chunks(client, catalog, count_queries, auth_headers, monkeypatch):
+    catalog(books=12, authors=3)
+    books = client.get('/books/', params={'limit': 100}).json()['items']
+    doomed = [book['id'] for book in books if book['author']['id'] == 1]
+    remaining = [book for book in books if book['author']['id'] != 1]
+    assert len(doomed) > 2
+    cursor = client.get('/changes/').json()['next_cursor']
+
+    monkeypatch.setattr(ConfigSettings, 'CASCADE_DELETE_CHUNK_SIZE', 1)
+    with count_queries() as statements:
+        response = client.delete('/authors/1', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert sum(statement.startswith('DELETE FROM books') for statement in statements) >= len(doomed)
+    assert response.json()['deleted'] == {'authors': 1, 'books': len(doomed)}
+    assert facet_counts(client) == {
+        facet: dict(Counter(book[relation]['id'] for book in remaining)) for facet, relation in FACET_RELATIONS.items()
+    }
+
+    changes = client.get('/changes/', params={'since': cursor, 'limit': 100}).json()['items']
+    assert [(change['entity'], change['op']) for change in changes] == (
+        [('books', 'deleted')] * len(doomed) + [('authors', 'deleted')]
+    )
+    assert [change['entity_id'] for change in changes] == [*doomed, 1]
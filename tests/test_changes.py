@@ -0,0 +1,43 @@
+from app.services.changes import ChangeOp, record_change
+from app.services.database import SessionLocal
+
+
+def changed_names(client, since: int) -> tuple[list[str], int]:
+    feed = client.get('/changes/', params={'since': since}).json()
+    return [item['data']['name'] for item in feed['items']], feed['next_cursor']
+
+
+def test_changes_are_numbered_in_commit_order(client, catalog, auth_headers):
+    catalog(books=1)
+    client.patch('/authors/1', json={'name': 'Before'}, headers=auth_headers)
+    names, cursor = changed_names(client, 0)
+    assert names == ['Before']
+
+    with SessionLocal() as long_running:
+        record_change(long_running, 'authors', ChangeOp.updated, {'id': 1, 'name': 'Started first'})
+
+        with SessionLocal() as short:
+            record_change(short, 'authors', ChangeOp.updated, {'id': 2, 'name': 'Committed first'})
+            short.commit()
+
+        names, cursor = changed_names(client, cursor)
+        assert names == ['Committed first']
+
+        long_running.commit()
+
+    names, cursor = changed_names(client, cursor)
+    assert names == ['Started first']
+
+
+def test_rolled_back_changes_are_never_published(client, catalog, auth_headers):
+    catalog(books=1)
+
+    with SessionLocal() as db:
+        record_change(db, 'authors', ChangeOp.updated, {'id': 1, 'name': 'Rolled back'})
+        db.rollback()
+        record_change(db, 'authors', ChangeOp.updated, {'id': 1, 'name': 'Committed'})
+        db.commit()
+
+    names, cursor = changed_names(client, 0)
+    assert names == ['Committed']
+    assert cursor == 1
@@ -0,0 +1,93 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+
+from app.main import app
+
+
+def stream_export(client, path: str, query: str = '') -> tuple[int, int, bytes]:
+    # The test client buffers whole bodies, so drive the app directly and count chunks as they arrive.
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('testclient', 50000),
+        'server': ('testserver', 80),
+    }
+    received = {'bytes': 0, 'first': None}
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            received['bytes'] += len(message.get('body', b''))
+            if received['first'] is None:
+                received['first'] = message.get('body')
+            if not message.get('more_body'):
+                done.set()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        client.portal.call(app, scope, receive, send)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, received['bytes'], received['first']
+
+
+def test_export_memory_stays_flat_as_the_catalog_grows(client, catalog):
+    catalog(books=1_000)
+    small_peak, small_bytes, _ = stream_export(client, '/books/export')
+
+    catalog(books=10_000)
+    large_peak, large_bytes, _ = stream_export(client, '/books/export')
+
+    assert large_bytes > 9 * small_bytes
+    assert large_peak < 2 * small_peak
+    assert large_peak < large_bytes
+
+
+def test_ndjson_export_joins_reference_names_and_honours_filters(client, catalog):
+    catalog(books=30)
+
+    response = client.get('/books/export', params={'author_id': 2})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+
+    books = [json.loads(line) for line in response.text.splitlines()]
+    assert books
+    assert {book['author_id'] for book in books} == {2}
+    assert all(book['author_name'] and book['category_name'] and book['publisher_name'] for book in books)
+    assert [book['id'] for book in books] == sorted(book['id'] for book in books)
+
+
+def test_csv_export_starts_with_a_header(client, catalog):
+    catalog(books=5)
+
+    response = client.get('/books/export', params={'format': 'csv'})
+    assert response.status_code == 200
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == [
+        'id', 'name', 'description', 'author_id', 'author_name',
+        'category_id', 'category_name', 'publisher_id', 'publisher_name',
+    ]
+    assert len(rows) == 6
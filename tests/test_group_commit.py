@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.instance.config import ConfigSettings
+
+
+@pytest.fixture
+def group_commit(monkeypatch):
+    monkeypatch.setattr(ConfigSettings, 'GROUP_COMMIT_ENABLED', True)
+
+
+def test_batched_book_creates_return_names_from_the_batch(client, catalog, auth_headers, group_commit):
+    catalog(books=1, authors=2)
+    author = client.get('/authors/2').json()
+    books = [
+        {'name': f'Batched book {number}', 'author_id': 2, 'category_id': 1, 'publisher_id': 1}
+        for number in range(8)
+    ]
+
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(lambda book: client.post('/books/', json=book, headers=auth_headers), books))
+
+    assert [response.status_code for response in responses] == [201] * 8
+    assert {response.json()['name'] for response in responses} == {book['name'] for book in books}
+    assert {response.json()['author']['name'] for response in responses} == {author['name']}
+    assert all(response.json()['category']['name'] and response.json()['publisher']['name'] for response in responses)
+
+
+def test_batched_creates_report_each_conflict(client, catalog, auth_headers, group_commit):
+    catalog(books=1)
+    taken = client.get('/authors/1').json()['name']
+    names = [taken, 'New author', 'New author', 'Another author']
+
+    def create(name):
+        return client.post('/authors/', json={'name': name}, headers=auth_headers)
+
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(executor.map(create, names))
+
+    assert sorted(response.status_code for response in responses) == [201, 201, 400, 400]
+    assert responses[0].json() == {'detail': "Author already exists."}
+    created = [response.json() for response in responses if response.status_code == 201]
+    assert {author['name'] for author in created} == {'New author', 'Another author'}
+    assert all(author['id'] and author['books'] == [] for author in created)
@@ -0,0 +1,66 @@
+import time
+
+from app.models import Author, Job
+from app.services.database import SessionLocal
+from app.services.jobs import JobKind, JobRunner, JobStatus, submit_job
+from app.services.jobs.kinds import JOB_KINDS, NoParams
+
+
+def run_next_job(kinds) -> Job:
+    runner = JobRunner(workers=0, poll_interval=0)
+    runner.kinds = kinds
+    job_id = runner.claim()
+    runner.run(job_id)
+    with SessionLocal() as db:
+        return db.get(Job, job_id)
+
+
+def test_jobs_reject_non_positive_max_attempts(client, auth_headers):
+    for max_attempts in (0, -1):
+        job = {'kind': 'rebuild_facets', 'max_attempts': max_attempts}
+        assert client.post('/jobs/', json=job, headers=auth_headers).status_code == 422
+
+
+def test_job_responses_do_not_echo_params(client, auth_headers):
+    records = [{'name': f'Imported author {number}'} for number in range(3)]
+    response = client.post(
+        '/jobs/', json={'kind': 'import', 'params': {'entity': 'authors', 'records': records}}, headers=auth_headers
+    )
+
+    assert response.status_code == 202
+    assert 'params' not in response.json()
+    assert 'params' not in client.get(response.headers['Location'], headers=auth_headers).json()
+
+
+def test_import_jobs_run_on_the_job_thread(client, auth_headers):
+    records = [{'name': f'Imported author {number}'} for number in range(5)]
+    client.post('/jobs/', json={
+        'kind': 'import', 'params': {'entity': 'authors', 'records': records, 'batch_size': 2},
+    }, headers=auth_headers)
+
+    job = run_next_job(JOB_KINDS)
+
+    assert job.status == JobStatus.succeeded
+    assert job.result['inserted'] == 5
+    assert (job.progress, job.total) == (5, 5)
+    with SessionLocal() as db:
+        assert db.query(Author).count() == 5
+
+
+def test_running_jobs_heartbeat_between_progress_reports(client, monkeypatch):
+    monkeypatch.setattr('app.instance.config.ConfigSettings.JOB_HEARTBEAT_SECONDS', 0.05)
+    heartbeats = []
+
+    def slow(context, params):
+        for _ in range(3):
+            time.sleep(0.15)
+            with SessionLocal() as db:
+                heartbeats.append(db.get(Job, context.job_id).heartbeat_at)
+
+    with SessionLocal() as db:
+        submit_job(db, 'slow', {})
+
+    job = run_next_job({'slow': JobKind(NoParams, slow)})
+
+    assert job.status == JobStatus.succeeded
+    assert len(set(heartbeats)) == 3
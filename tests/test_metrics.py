@@ -0,0 +1,25 @@
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services.database import engine
+from app.services.metrics import RequestStats, current_request_stats
+
+
+def test_failing_statements_do_not_skew_the_next_timing():
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql('SELECT * FROM missing_table')
+            assert connection.info.get('query_start_times') == []
+
+            time.sleep(0.2)
+            connection.exec_driver_sql('SELECT 1')
+    finally:
+        current_request_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.db_time < 0.2
@@ -0,0 +1,117 @@
+import json
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.auth.routes import auth_router
+from app.instance.config import ConfigSettings
+from app.models import Author
+from app.resources.books.routes import books_router
+from app.resources.users.routes import users_router
+from app.services import profiling
+from app.services.database import engine, get_db
+from app.services.profiling import ProfilingMiddleware, RequestProfile, current_profile, install_profiling
+
+
+LISTENERS = [
+    ('before_cursor_execute', profiling.before_cursor_execute),
+    ('after_cursor_execute', profiling.after_cursor_execute),
+    ('handle_error', profiling.handle_error),
+]
+
+
+@pytest.fixture
+def profiled():
+    for name, listener in LISTENERS:
+        event.listen(Engine, name, listener)
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    yield profile
+    current_profile.reset(token)
+    for name, listener in LISTENERS:
+        event.remove(Engine, name, listener)
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(ConfigSettings, 'SLOW_QUERY_THRESHOLD_MS', 0)
+    monkeypatch.setattr(ConfigSettings, 'N_PLUS_ONE_THRESHOLD', 3)
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(auth_router)
+    app.include_router(users_router)
+    app.include_router(books_router)
+
+    @app.get('/author-names')
+    def author_names(db: Session = Depends(get_db)):
+        return [db.execute(select(Author.name).where(Author.id == id)).scalar() for id in (1, 2, 3)]
+
+    install_profiling(app)
+    yield TestClient(app)
+    for name, listener in LISTENERS:
+        event.remove(Engine, name, listener)
+
+
+def profile_events(caplog, event_name: str) -> list[dict]:
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.name == 'app.profiling']
+    return [record for record in records if record['event'] == event_name]
+
+
+def server_timing(response) -> dict[str, str]:
+    entries = [entry.strip().split(';', 1) for entry in response.headers['Server-Timing'].split(',')]
+    return dict(entries)
+
+
+def test_failing_statements_do_not_skew_the_next_timing(profiled):
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql('SELECT * FROM missing_table')
+        assert connection.info.get('profile_start_times') == []
+
+        time.sleep(0.2)
+        connection.exec_driver_sql('SELECT 1')
+
+    assert [query.statement for query in profiled.queries] == ['SELECT * FROM missing_table', 'SELECT 1']
+    assert profiled.db_time < 0.2
+
+
+def test_profiled_requests_report_server_timing_and_slow_queries(profiled_client, catalog, caplog):
+    catalog(books=5)
+
+    response = profiled_client.get('/books/', params={'limit': 5})
+
+    assert response.status_code == 200
+    timing = server_timing(response)
+    assert {'db', 'queries', 'serialize', 'total'} <= set(timing)
+    assert int(timing['queries'].split('"')[1]) >= 1
+    slow = profile_events(caplog, 'slow_query')
+    assert slow
+    assert {(record['method'], record['route']) for record in slow} == {('GET', '/books/')}
+    assert all(record['statement'] for record in slow)
+
+
+def test_profiled_requests_time_authentication(profiled_client):
+    profiled_client.post('/users/', json={'email': 'reader@example.com', 'password': 'secret'})
+    token = profiled_client.post('/token', data={'username': 'reader@example.com', 'password': 'secret'}).json()
+
+    response = profiled_client.get('/users/me/', headers={'Authorization': f"Bearer {token['access_token']}"})
+
+    assert response.status_code == 200
+    assert 'auth' in server_timing(response)
+
+
+def test_profiled_requests_flag_repeated_statements(profiled_client, catalog, caplog):
+    catalog(books=3, authors=3)
+
+    assert len(profiled_client.get('/author-names').json()) == 3
+
+    [flagged] = profile_events(caplog, 'probable_n_plus_one')
+    assert (flagged['route'], flagged['count']) == ('/author-names', 3)
+    assert 'authors' in flagged['statement']
@@ -0,0 +1,70 @@
+import base64
+import json
+
+import pytest
+
+from app.services.references import reference_data
+
+
+LIST_QUERY_BUDGETS = {
+    '/books/?limit=100': 4,
+    '/authors/?limit=100&include=books': 2,
+    '/categories/?limit=100&include=books': 2,
+    '/publishers/?limit=100&include=books': 2,
+}
+
+
+@pytest.mark.parametrize('path', LIST_QUERY_BUDGETS)
+def test_list_endpoints_stay_within_query_budget(client, catalog, count_queries, path):
+    counts = []
+    for books in (5, 60):
+        catalog(books=books, authors=10, categories=10, publishers=10)
+        client.get(path)
+        with count_queries() as statements:
+            response = client.get(path)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= LIST_QUERY_BUDGETS[path]
+
+
+def test_books_list_eager_loads_without_the_reference_snapshot(client, catalog, count_queries, monkeypatch):
+    monkeypatch.setattr(reference_data, 'store', None)
+    catalog(books=60, authors=10, categories=10, publishers=10)
+
+    with count_queries() as statements:
+        response = client.get('/books/?limit=100')
+
+    assert response.status_code == 200
+    assert all(book['author']['name'] for book in response.json()['items'])
+    assert len(statements) <= 4
+
+
+def test_pagination_walks_every_book_once(client, catalog):
+    catalog(books=23)
+
+    ids = []
+    cursor = None
+    while True:
+        response = client.get('/books/', params={'limit': 5, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page['items']) <= 5
+        ids.extend(book['id'] for book in page['items'])
+        cursor = page.get('next_cursor')
+        if cursor is None:
+            break
+
+    assert ids == list(range(1, 24))
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    base64.urlsafe_b64encode(json.dumps({'id': True}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps({'id': '1'}).encode()).decode(),
+])
+def test_pagination_rejects_a_malformed_cursor(client, cursor):
+    response = client.get('/books/', params={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Invalid cursor.'}
@@ -0,0 +1,71 @@
+import uuid
+
+from app.services.references import reference_data
+from app.services.references.stores import JOURNAL_SLOTS, SharedReferenceStore
+
+
+def test_renames_reach_the_snapshot_before_the_next_refresh(client, catalog, auth_headers):
+    catalog(books=5, authors=1)
+    assert client.get('/books/1').json()['author']['name'] != 'Renamed author'
+    cursor, refreshed_at, _ = reference_data.store.state()
+
+    client.patch('/authors/1', json={'name': 'Renamed author'}, headers=auth_headers)
+
+    assert client.get('/books/1').json()['author']['name'] == 'Renamed author'
+    assert [book['author']['name'] for book in client.get('/books/').json()['items']] == ['Renamed author'] * 5
+    assert reference_data.store.state()[:2] == (cursor, refreshed_at)
+
+
+def test_deleted_references_leave_the_snapshot(client, catalog, auth_headers):
+    catalog(books=1, authors=2)
+    client.get('/books/1')
+
+    client.delete('/authors/2', headers=auth_headers)
+
+    assert reference_data.store.name('authors', 2) is None
+    assert reference_data.store.name('authors', 1) is not None
+
+
+def test_rolled_back_writes_do_not_reach_the_snapshot(client, catalog, auth_headers):
+    catalog(books=2, authors=2)
+    client.get('/books/1')
+    name = reference_data.store.name('authors', 2)
+
+    taken = reference_data.store.name('authors', 1)
+    response = client.patch('/authors/2', json={'name': taken}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert reference_data.store.name('authors', 2) == name
+
+
+def test_committed_writes_do_not_wait_for_a_refresh_in_progress(client, catalog, auth_headers):
+    catalog(books=1, authors=1)
+    client.get('/books/1')
+
+    with reference_data.store.writer() as acquired:
+        assert acquired
+        response = client.patch('/authors/1', json={'name': 'Renamed mid-refresh'}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert client.get('/books/1').json()['author']['name'] == 'Renamed mid-refresh'
+
+
+def test_shared_snapshot_prefers_writes_newer_than_its_cursor():
+    store = SharedReferenceStore(f'test_references_{uuid.uuid4().hex[:12]}', 4096)
+    try:
+        store.replace({'authors': {1: 'Packed', 2: 'Packed'}, 'categories': {}, 'publishers': {}}, 10, 0.0, 0.0)
+
+        store.patch([(9, 'authors', 1, 'Older'), (11, 'authors', 2, 'Newer'), (12, 'authors', 3, 'x' * 200)])
+        assert [store.name('authors', id) for id in (1, 2, 3)] == ['Packed', 'Newer', None]
+
+        store.patch([(13, 'authors', 2, None)])
+        assert store.name('authors', 2) is None
+
+        store.patch([(14 + number, 'categories', number, 'Overflow') for number in range(JOURNAL_SLOTS)])
+        assert store.name('authors', 1) is None
+
+        store.replace(store.maps(), 14 + JOURNAL_SLOTS, 0.0, 0.0)
+        assert store.name('authors', 1) == 'Packed'
+    finally:
+        store.close()
+        store.shm.unlink()
@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.models import Author
+from app.resources.authors.routes import authors_router
+from app.services.database import Base, make_engine
+from app.services.database.replicas import ReadYourWritesMiddleware, ReplicaSet
+
+
+@pytest.fixture
+def routed_client(monkeypatch, auth_headers):
+    def routed_client(replica_url: str) -> TestClient:
+        replica_engine = make_engine(replica_url)
+        monkeypatch.setattr('app.services.database.replica_set', ReplicaSet([replica_engine], check_interval=0))
+
+        app = FastAPI()
+        app.add_middleware(ReadYourWritesMiddleware)
+        app.include_router(authors_router)
+        client = TestClient(app)
+        client.headers.update(auth_headers)
+        return client
+
+    return routed_client
+
+
+def seeded_replica(path) -> str:
+    url = f'sqlite:///{path}'
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Author).values(id=1, name='Replica copy'))
+    engine.dispose()
+    return url
+
+
+def test_reads_go_to_the_replica_until_the_client_writes(client, catalog, routed_client, tmp_path):
+    catalog(books=1, authors=1)
+    primary_name = client.get('/authors/1').json()['name']
+    routed = routed_client(seeded_replica(tmp_path / 'replica.db'))
+
+    assert routed.get('/authors/1').json()['name'] == 'Replica copy'
+
+    response = routed.post('/authors/', json={'name': 'Written to the primary'})
+    assert response.status_code == 201
+    assert 'X-Primary-Until' in response.headers
+
+    assert routed.get('/authors/1').json()['name'] == primary_name
+    assert routed.get('/authors/2').json()['name'] == 'Written to the primary'
+
+    routed.cookies.clear()
+    assert routed.get('/authors/1').json()['name'] == 'Replica copy'
+
+
+def test_reads_fall_back_to_the_primary_when_the_replica_is_down(client, catalog, routed_client, tmp_path):
+    catalog(books=1, authors=1)
+    primary_name = client.get('/authors/1').json()['name']
+    routed = routed_client(f'sqlite:///{tmp_path / "missing" / "replica.db"}')
+
+    assert routed.get('/authors/1').json()['name'] == primary_name
@@ -0,0 +1,32 @@
+from sqlalchemy import create_engine
+
+from app import migrations
+from app.migrations import Migration, applied_versions
+from app.services.database import Base, engine
+from app.services.database.schema import ensure_schema
+from benchmarks.explain import check_query_plans
+
+
+def test_new_migrations_run_even_when_the_models_are_unchanged(tmp_path, monkeypatch):
+    scratch = create_engine(f'sqlite:///{tmp_path / "schema.db"}')
+    assert ensure_schema(scratch, Base.metadata)
+    assert not ensure_schema(scratch, Base.metadata)
+
+    upgraded = []
+    head = migrations.load_migrations()
+    added = Migration(head[-1].version + 1, 'v9999_data_fix', upgraded.append, True)
+    monkeypatch.setattr(migrations, 'load_migrations', lambda: [*head, added])
+
+    assert ensure_schema(scratch, Base.metadata)
+    assert len(upgraded) == 1
+    assert added.version in applied_versions(scratch)
+
+
+def test_hot_routes_use_indexes(client, catalog):
+    catalog(books=500, authors=20, categories=10, publishers=10)
+
+    results = check_query_plans(client, engine)
+
+    assert results
+    assert {result['status'] for result in results} == {200}
+    assert [result['name'] for result in results if result['seq_scans']] == []
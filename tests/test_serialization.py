@@ -0,0 +1,30 @@
+import pytest
+
+from app.instance.config import ConfigSettings
+from app.services.references import reference_data
+
+
+@pytest.mark.parametrize('snapshot', [True, False])
+@pytest.mark.parametrize('path', [
+    '/books/?limit=5',
+    '/books/?limit=5&author_id=1',
+    '/authors/?limit=5',
+    '/authors/?limit=5&include=books&books_limit=2',
+    '/categories/?limit=5&fields=name',
+    '/categories/?limit=5&fields=description&include=books',
+    '/publishers/?limit=5&include=books',
+])
+def test_fast_serialization_renders_the_same_pages(client, catalog, monkeypatch, snapshot, path):
+    if not snapshot:
+        monkeypatch.setattr(reference_data, 'store', None)
+    catalog(books=20)
+
+    pages = []
+    for fast in (False, True):
+        monkeypatch.setattr(ConfigSettings, 'FAST_SERIALIZATION', fast)
+        response = client.get(path)
+        assert response.status_code == 200
+        pages.append(response.json())
+
+    assert pages[0]['items']
+    assert pages[0] == pages[1]
@@ -0,0 +1,124 @@
+import pytest
+
+from app.instance.config import ConfigSettings
+from app.services.database import engine
+from app.services.references import reference_data
+
+
+BOOK = {'name': 'The Dispossessed', 'description': 'An ambiguous utopia.', 'author_id': 1, 'category_id': 1, 'publisher_id': 1}
+
+# Statements per write with RETURNING (including the change id allocation), plus the follow-up
+# SELECTs dialects without it need.
+WRITE_ROUND_TRIPS = [
+    ('post', '/authors/', {'name': 'Ursula Le Guin'}, 3, 1),
+    ('post', '/categories/', {'name': 'Poetry'}, 3, 1),
+    ('post', '/publishers/', {'name': 'Tor Books'}, 3, 1),
+    ('post', '/books/', BOOK, 4, 2),
+    ('patch', '/authors/1', {'name': 'Renamed author'}, 4, 2),
+    ('patch', '/categories/1', {'name': 'Renamed category'}, 4, 2),
+    ('patch', '/publishers/1', {'name': 'Renamed publisher'}, 4, 2),
+]
+
+
+@pytest.mark.parametrize('method, path, body, statements_with_returning, fallback_selects', WRITE_ROUND_TRIPS)
+def test_writes_stay_within_round_trip_budget(
+    client, catalog, count_queries, auth_headers, method, path, body, statements_with_returning, fallback_selects
+):
+    catalog(books=3)
+    client.get('/books/?limit=1')
+
+    with count_queries() as statements:
+        response = client.request(method, path, json=body, headers=auth_headers)
+
+    assert response.status_code in (200, 201)
+    assert len(statements) == statements_with_returning + (0 if engine.dialect.full_returning else fallback_selects)
+
+
+def test_book_rename_stays_within_round_trip_budget(client, catalog, count_queries, auth_headers):
+    catalog(books=3)
+    book = client.get('/books/1').json()
+    body = {
+        'name': 'Renamed book',
+        'author_id': book['author']['id'],
+        'category_id': book['category']['id'],
+        'publisher_id': book['publisher']['id'],
+    }
+
+    with count_queries() as statements:
+        response = client.patch('/books/1', json=body, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed book'
+    assert len(statements) == 4 + (0 if engine.dialect.full_returning else 2)
+
+
+@pytest.mark.parametrize('path, detail', [
+    ('/authors/', "Author already exists."),
+    ('/categories/', "Category already exists."),
+    ('/publishers/', "Publisher already exists."),
+])
+def test_duplicate_names_map_to_their_messages(client, catalog, auth_headers, path, detail):
+    catalog(books=1)
+    name = client.get(f'{path}1').json()['name']
+
+    response = client.post(path, json={'name': name}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json() == {'detail': detail}
+
+    response = client.patch(f'{path}2', json={'name': name}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json() == {'detail': detail}
+
+
+@pytest.mark.parametrize('snapshot', [True, False])
+@pytest.mark.parametrize('column, detail', [
+    ('author_id', "Author not found."),
+    ('category_id', "Category not found."),
+    ('publisher_id', "Publisher not found."),
+])
+def test_missing_book_references_map_to_their_messages(client, catalog, auth_headers, monkeypatch, snapshot, column, detail):
+    if not snapshot:
+        monkeypatch.setattr(reference_data, 'store', None)
+    catalog(books=1)
+
+    response = client.post('/books/', json={**BOOK, column: 999}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json() == {'detail': detail}
+
+    response = client.patch('/books/1', json={**BOOK, column: 999}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json() == {'detail': detail}
+
+
+def test_duplicate_book_names_map_to_their_message(client, catalog, auth_headers):
+    catalog(books=2)
+    book = client.get('/books/1').json()
+
+    response = client.post('/books/', json={**BOOK, 'name': book['name']}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json() == {'detail': "Book already exists."}
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/authors/999', {'name': 'Nobody'}),
+    ('/categories/999', {'name': 'Nothing'}),
+    ('/publishers/999', {'name': 'No press'}),
+    ('/books/999', BOOK),
+])
+def test_patching_a_missing_row_returns_404(client, catalog, auth_headers, path, body):
+    catalog(books=1)
+
+    response = client.patch(path, json=body, headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('path', ['/authors/1', '/categories/1', '/publishers/1'])
+def test_patch_responses_embed_a_bounded_page_of_books(client, catalog, auth_headers, path):
+    catalog(books=200, authors=1, categories=1, publishers=1)
+
+    response = client.patch(path, json={'name': 'Renamed'}, headers=auth_headers)
+
+    assert response.status_code == 200
+    books = response.json()['books']
+    assert len(books) == ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT
+    assert [book['id'] for book in books] == list(range(1, ConfigSettings.EMBED_BOOKS_DEFAULT_LIMIT + 1))